@@ -13,11 +13,11 @@ from app.core.dependencies import (
 from app.models.assembly import Assembly, AssemblyFetched, AssemblySubmission
 from app.models.organism import Organism
 from app.models.sample import Sample
-from app.models.experiment import Experiment
-from app.models.read import Read
 from app.schemas.common import SubmissionStatus
 from app.models.user import User
+from app.services.experiment_service import experiment_service
 from app.services.organism_service import organism_service
+from app.services.read_service import read_service
 from app.schemas.assembly import (
     Assembly as AssemblySchema,
     AssemblyCreate,
@@ -100,16 +100,19 @@ def get_pipeline_inputs(
     result = []
     files_dict = {}
     
-    # Collect all reads for this organism through the sample->experiment->read relationship
+    # Collect all reads for this organism through the sample->experiment->read relationship,
+    # fetching each level in a single query
+    experiments_by_sample = experiment_service.get_many_by_sample_ids(db, [sample.id for sample in samples])
+    reads_by_experiment = read_service.get_many_by_experiment_ids(
+        db, [experiment.id for experiments in experiments_by_sample.values() for experiment in experiments]
+    )
     for sample in samples:
         print(f"Sample {sample.id} found for organism with grouping key '{organism_grouping_key}'")
-        # Get experiments for this sample
-        experiments = db.query(Experiment).filter(Experiment.sample_id == sample.id).all()
+        experiments = experiments_by_sample[sample.id]
         
         for experiment in experiments:
             print(f"Experiment {experiment.id} found for sample {sample.id}")
-            # Get reads for this experiment
-            reads = db.query(Read).filter(Read.experiment_id == experiment.id).all()
+            reads = reads_by_experiment[experiment.id]
             
             for read in reads:
                 print(f"Read {read.id} found for experiment {experiment.id}")
@@ -170,16 +173,19 @@ def get_pipeline_inputs_by_tax_id(
             print(f"No samples found for organism with ID {organism.id}")
             continue
         
-        # Collect all reads for this organism through the sample->experiment->read relationship
+        # Collect all reads for this organism through the sample->experiment->read relationship,
+        # fetching each level in a single query
+        experiments_by_sample = experiment_service.get_many_by_sample_ids(db, [sample.id for sample in samples])
+        reads_by_experiment = read_service.get_many_by_experiment_ids(
+            db, [experiment.id for experiments in experiments_by_sample.values() for experiment in experiments]
+        )
         for sample in samples:
             print(f"Sample {sample.id} found for organism {organism.id}")
-            # Get experiments for this sample
-            experiments = db.query(Experiment).filter(Experiment.sample_id == sample.id).all()
+            experiments = experiments_by_sample[sample.id]
             
             for experiment in experiments:
                 print(f"Experiment {experiment.id} found for sample {sample.id}")
-                # Get reads for this experiment
-                reads = db.query(Read).filter(Read.experiment_id == experiment.id).all()
+                reads = reads_by_experiment[experiment.id]
                 
                 for read in reads:
                     print(f"Read {read.id} found for experiment {experiment.id}")
@@ -12,6 +12,7 @@ from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 
 from app.core.dependencies import get_current_active_user, get_db
+from app.core.settings import settings
 from app.models.read import Read
 from app.models.user import User
 from app.utils.xml_generator import generate_runs_xml
@@ -65,6 +66,9 @@ def get_experiment_reads_xml(
         )
     
     # Generate XML using the utility function
-    xml_content = generate_runs_xml(reads_data)
+    try:
+        xml_content = generate_runs_xml(reads_data, pretty=settings.XML_PRETTY)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return xml_content
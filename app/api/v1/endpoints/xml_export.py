@@ -12,6 +12,7 @@ from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 
 from app.core.dependencies import get_current_active_user, get_db
+from app.core.settings import settings
 from app.models.sample import SampleSubmission
 from app.models.experiment import Experiment, ExperimentSubmission
 from app.models.read import Read
@@ -76,12 +77,16 @@ def get_sample_xml(
         )
     
     # Generate XML using the utility function
-    xml_content = generate_sample_xml(
-        organism=organism,
-        submission_json=sample_submission.submission_json,
-        alias=sample_submission.sample.bpa_sample_id if sample_submission.sample else f"sample_{sample_submission.sample_id}",
-        accession=sample_submission.sample.sample_accession if sample_submission.sample and sample_submission.sample.sample_accession else None
-    )
+    try:
+        xml_content = generate_sample_xml(
+            organism=organism,
+            submission_json=sample_submission.submission_json,
+            alias=sample_submission.sample.bpa_sample_id if sample_submission.sample else f"sample_{sample_submission.sample_id}",
+            accession=sample_submission.sample.sample_accession if sample_submission.sample and sample_submission.sample.sample_accession else None,
+            pretty=settings.XML_PRETTY
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return xml_content
 
@@ -147,12 +152,16 @@ def get_experiment_sample_xml(
         )
     
     # Generate XML using the utility function
-    xml_content = generate_sample_xml(
-        organism=organism,
-        submission_json=sample_submission.submission_json,
-        alias=sample_submission.sample.bpa_sample_id if sample_submission.sample else f"sample_{sample_submission.sample_id}",
-        accession=sample_submission.sample.sample_accession if sample_submission.sample and sample_submission.sample.sample_accession else None
-    )
+    try:
+        xml_content = generate_sample_xml(
+            organism=organism,
+            submission_json=sample_submission.submission_json,
+            alias=sample_submission.sample.bpa_sample_id if sample_submission.sample else f"sample_{sample_submission.sample_id}",
+            accession=sample_submission.sample.sample_accession if sample_submission.sample and sample_submission.sample.sample_accession else None,
+            pretty=settings.XML_PRETTY
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return xml_content
 
@@ -195,15 +204,19 @@ def get_experiment_xml(
         )
     
     # Generate XML using the utility function
-    xml_content = generate_experiment_xml(
-        submission_json=experiment_submission.submission_json,
-        alias=experiment_submission.submission_json.get("alias"),
-        study_accession=study_accession,
-        study_alias=study_alias,
-        sample_accession=sample_accession,
-        sample_alias=sample_alias,
-        accession=experiment_submission.experiment_accession if experiment_submission.experiment_accession else None
-    )
+    try:
+        xml_content = generate_experiment_xml(
+            submission_json=experiment_submission.submission_json,
+            alias=experiment_submission.submission_json.get("alias"),
+            study_accession=study_accession,
+            study_alias=study_alias,
+            sample_accession=sample_accession,
+            sample_alias=sample_alias,
+            accession=experiment_submission.experiment_accession if experiment_submission.experiment_accession else None,
+            pretty=settings.XML_PRETTY
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return xml_content
 
@@ -250,15 +263,19 @@ def get_experiment_by_package_id_xml(
         )
     
     # Generate XML using the utility function
-    xml_content = generate_experiment_xml(
-        submission_json=experiment_submission.submission_json,
-        alias=experiment_submission.submission_json.get("alias"),
-        study_accession=study_accession,
-        study_alias=study_alias,
-        sample_accession=sample_accession,
-        sample_alias=sample_alias,
-        accession=experiment_submission.experiment_accession if experiment_submission.experiment_accession else None
-    )
+    try:
+        xml_content = generate_experiment_xml(
+            submission_json=experiment_submission.submission_json,
+            alias=experiment_submission.submission_json.get("alias"),
+            study_accession=study_accession,
+            study_alias=study_alias,
+            sample_accession=sample_accession,
+            sample_alias=sample_alias,
+            accession=experiment_submission.experiment_accession if experiment_submission.experiment_accession else None,
+            pretty=settings.XML_PRETTY
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return xml_content
 
@@ -297,13 +314,17 @@ def get_read_xml(
         )
     
     # Generate XML using the utility function
-    xml_content = generate_run_xml(
-        submission_json=read.submission_json,
-        alias=read.bpa_dataset_id if read.bpa_dataset_id else f"read_{read_id}",
-        experiment_accession=experiment_accession,
-        experiment_alias=experiment_alias,
-        accession=read.submission_json.get("run_accession")
-    )
+    try:
+        xml_content = generate_run_xml(
+            submission_json=read.submission_json,
+            alias=read.bpa_dataset_id if read.bpa_dataset_id else f"read_{read_id}",
+            experiment_accession=experiment_accession,
+            experiment_alias=experiment_alias,
+            accession=read.submission_json.get("run_accession"),
+            pretty=settings.XML_PRETTY
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return xml_content
 
@@ -372,11 +393,15 @@ def get_reads_xml(
         )
     
     # Generate XML using the utility function
-    xml_content = generate_runs_xml(
-        runs_data=reads_data, 
-        experiment_accession=experiment_accession, 
-        experiment_alias=experiment_alias
-    )
+    try:
+        xml_content = generate_runs_xml(
+            runs_data=reads_data, 
+            experiment_accession=experiment_accession, 
+            experiment_alias=experiment_alias,
+            pretty=settings.XML_PRETTY
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return xml_content
 
@@ -429,10 +454,14 @@ def get_experiment_reads_xml(
         )
     
     # Generate XML using the utility function
-    xml_content = generate_runs_xml(
-        runs_data=reads_data, 
-        experiment_accession=experiment_accession, 
-        experiment_alias=experiment_alias
-    )
+    try:
+        xml_content = generate_runs_xml(
+            runs_data=reads_data, 
+            experiment_accession=experiment_accession, 
+            experiment_alias=experiment_alias,
+            pretty=settings.XML_PRETTY
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return xml_content
@@ -31,6 +31,9 @@ class Settings(BaseSettings):
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
     
+    # XML export
+    XML_PRETTY: bool = False  # Indent XML responses for reading
+    
     # Model config
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -4,8 +4,14 @@ from sqlalchemy.orm import sessionmaker
 
 from app.core.settings import settings
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URI)
+# Create SQLAlchemy engine; bulk inserts are sent as multi-row VALUES batches and
+# bulk UPDATE/DELETE executemany calls go through psycopg2's execute_batch
+engine = create_engine(
+    settings.DATABASE_URI,
+    executemany_mode="values_plus_batch",
+    insertmanyvalues_page_size=1000,
+    executemany_batch_page_size=500,
+)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,9 +1,9 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text, Boolean
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, DateTime, ForeignKey, String, Text, Boolean
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.session import Base
 
@@ -19,6 +19,7 @@ class GenomeNote(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     organism_id = Column(UUID(as_uuid=True), ForeignKey("organism.id"), nullable=False)
     note = Column(Text, nullable=True)
+    note_tsv = deferred(Column(TSVECTOR, Computed("to_tsvector('english', coalesce(note, ''))", persisted=True)))
     other_fields = Column(Text, nullable=True)
     version_chain_id = Column(UUID(as_uuid=True), nullable=True)
     is_published = Column(Boolean, nullable=False, default=False)
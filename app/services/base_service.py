@@ -1,9 +1,14 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, Optional, Sequence, Type, TypeVar, Union
 from uuid import UUID
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.orm import Query, Session, raiseload, selectinload
 
 from app.db.session import Base
 
@@ -12,30 +17,223 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+class LookupCache:
+    """
+    Bounded, time-limited cache mapping (model, column, value) lookups to primary keys.
+
+    Only the primary key is cached; callers resolve it through Session.get so that
+    the session identity map stays authoritative for the returned instance.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached primary key for a lookup, or None on miss/expiry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            pk, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return pk
+
+    def set(self, key: Hashable, pk: Any) -> None:
+        """
+        Store the primary key for a lookup, evicting the least recently used entry.
+        """
+        with self._lock:
+            self._entries[key] = (pk, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Drop a single lookup.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_models(self, models: set) -> None:
+        """
+        Drop every lookup cached for the given model classes.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in models]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Drop all cached lookups.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+lookup_cache = LookupCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_lookup_cache(session: Session, flush_context: Any) -> None:
+    """
+    Forget cached lookups for any model written in this flush.
+    """
+    touched = {type(obj) for obj in (*session.new, *session.dirty, *session.deleted)}
+    if touched:
+        lookup_cache.invalidate_models(touched)
+
+
 class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Base class for services with common CRUD operations.
     """
 
+    # Filter name -> clause using a bindparam of the same name; declared by subclasses
+    _filter_map: Dict[str, ColumnElement] = {}
+
     def __init__(self, model: Type[ModelType]):
         """
         Initialize with the SQLAlchemy model class.
         """
         self.model = model
 
-    def get(self, db: Session, id: UUID) -> Optional[ModelType]:
+    def loader_options(self, eager: Optional[Sequence[str]] = None) -> List[Any]:
+        """
+        Build relationship loader options for queries returning model instances.
+
+        Relationships named in eager (dotted paths such as "experiments.reads" are
+        allowed) are loaded with selectinload; every other relationship raises on
+        lazy access so accidental per-row loads surface as errors instead of N+1 queries.
+        """
+        options = []
+        for path in eager or ():
+            model, loader = self.model, None
+            for name in path.split("."):
+                attr = getattr(model, name)
+                loader = selectinload(attr) if loader is None else loader.selectinload(attr)
+                model = attr.property.mapper.class_
+            options.append(loader)
+        options.append(raiseload("*"))
+        return options
+
+    def query(self, db: Session, eager: Optional[Sequence[str]] = None) -> Query:
+        """
+        Start a query for the model with the default loader options applied.
+        """
+        return db.query(self.model).options(*self.loader_options(eager))
+
+    def get(self, db: Session, id: UUID, eager: Optional[Sequence[str]] = None) -> Optional[ModelType]:
         """
         Get a record by ID.
         """
-        return db.query(self.model).filter(self.model.id == id).first()
+        return self.query(db, eager).filter(self.model.id == id).first()
+
+    def get_by_cached(
+        self, db: Session, field: str, value: Any, eager: Optional[Sequence[str]] = None
+    ) -> Optional[ModelType]:
+        """
+        Get the record whose unique field equals value, caching the primary key.
+
+        Intended for reference-data lookups that are repeated many times per request
+        or ingestion run. Cached entries expire after the cache TTL and are dropped
+        whenever a flush in this process writes to the model. Writes made elsewhere
+        (other workers, raw SQL, bulk updates) do not clear the cache, so a cached row
+        is only returned if its field still holds the value; otherwise the lookup
+        falls through to the database.
+        """
+        column = self.model.__mapper__.columns[field]
+        if not (column.unique or column.primary_key):
+            raise ValueError(f"{self.model.__name__}.{field} is not unique and cannot be looked up through the cache")
+        key = (self.model, field, value)
+        pk = lookup_cache.get(key)
+        if pk is not None:
+            obj = db.get(self.model, pk, options=self.loader_options(eager))
+            if obj is not None and getattr(obj, field) == value:
+                return obj
+            lookup_cache.discard(key)
+        obj = self.query(db, eager).filter(column == value).first()
+        if obj is not None:
+            lookup_cache.set(key, obj.id)
+        return obj
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self, db: Session, *, skip: int = 0, limit: int = 100, eager: Optional[Sequence[str]] = None
     ) -> List[ModelType]:
         """
         Get multiple records.
         """
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self.query(db, eager).offset(skip).limit(limit).all()
+
+    def get_multi_with_filters(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+        eager: Optional[Sequence[str]] = None,
+        **filters: Any
+    ) -> Union[List[ModelType], List[Dict[str, Any]]]:
+        """
+        Get records matching the given filters, optionally projected to the given fields.
+
+        Each filter name must be a key of _filter_map; filters passed as None or an
+        empty string are ignored. Values are bound to the pre-built clauses rather
+        than composed into new expressions on every call.
+        """
+        query = self.filtered_query(db, filters, eager)
+        return self.paginate(query, skip=skip, limit=limit, fields=fields)
+
+    def filtered_query(
+        self, db: Session, filters: Dict[str, Any], eager: Optional[Sequence[str]] = None
+    ) -> Query:
+        """
+        Build a query applying the _filter_map clauses for the given filters.
+        """
+        unknown = filters.keys() - self._filter_map.keys()
+        if unknown:
+            raise TypeError(f"Unknown {self.model.__name__} filters: {', '.join(sorted(unknown))}")
+        values = {name: value for name, value in filters.items() if value is not None and value != ""}
+        return self.query(db, eager).filter(*[self._filter_map[name] for name in values]).params(**values)
+
+    def columns_for(self, fields: Sequence[str]) -> List[Any]:
+        """
+        Resolve field names to mapped columns, rejecting unknown names.
+        """
+        mapped = self.model.__mapper__.columns
+        unknown = [field for field in fields if field not in mapped]
+        if unknown:
+            raise ValueError(f"Unknown {self.model.__name__} fields: {', '.join(unknown)}")
+        return [getattr(self.model, field) for field in fields]
+
+    def paginate(
+        self,
+        query: Query,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None
+    ) -> Union[List[ModelType], List[Dict[str, Any]]]:
+        """
+        Apply offset/limit to a query and return model instances.
+
+        When fields are given only those columns are selected and each row is
+        returned as a plain dict, skipping ORM hydration entirely. List routes
+        that only render a few columns should opt in by passing fields.
+        """
+        query = query.offset(skip).limit(limit)
+        if not fields:
+            return query.all()
+        return [dict(row._mapping) for row in query.with_entities(*self.columns_for(fields)).all()]
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         """
@@ -1,66 +1,64 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from uuid import UUID
 
+from sqlalchemy import bindparam
 from sqlalchemy.orm import Session
 
 from app.models.experiment import Experiment, ExperimentFetched, ExperimentSubmission
 from app.schemas.experiment import ExperimentCreate, ExperimentUpdate
 from app.services.base_service import BaseService
 
+_EXPERIMENT_SAMPLE_ID = Experiment.sample_id == bindparam("sample_id")
+_EXPERIMENT_SUBMISSION_EXPERIMENT_ID = ExperimentSubmission.experiment_id == bindparam("experiment_id")
+_EXPERIMENT_FETCHED_EXPERIMENT_ID = ExperimentFetched.experiment_id == bindparam("experiment_id")
+_EXPERIMENT_SAMPLE_IDS = Experiment.sample_id.in_(bindparam("sample_ids", expanding=True))
+
 
 class ExperimentService(BaseService[Experiment, ExperimentCreate, ExperimentUpdate]):
     """Service for Experiment operations."""
+
+    _filter_map = {
+        "sample_id": _EXPERIMENT_SAMPLE_ID,
+        "experiment_accession": Experiment.experiment_accession == bindparam("experiment_accession"),
+        "run_accession": Experiment.run_accession == bindparam("run_accession"),
+    }
     
-    def get_by_sample_id(self, db: Session, sample_id: UUID) -> List[Experiment]:
+    def get_by_sample_id(self, db: Session, sample_id: UUID, eager: Optional[Sequence[str]] = None) -> List[Experiment]:
         """Get experiments by sample ID."""
-        return db.query(Experiment).filter(Experiment.sample_id == sample_id).all()
+        return self.query(db, eager).filter(_EXPERIMENT_SAMPLE_ID).params(sample_id=sample_id).all()
     
-    def get_by_experiment_accession(self, db: Session, experiment_accession: str) -> Optional[Experiment]:
+    def get_many_by_sample_ids(self, db: Session, sample_ids: List[UUID], eager: Optional[Sequence[str]] = None) -> Dict[UUID, List[Experiment]]:
+        """Get experiments for several samples in one query, grouped by sample ID."""
+        grouped: Dict[UUID, List[Experiment]] = {sample_id: [] for sample_id in sample_ids}
+        if not sample_ids:
+            return grouped
+        for experiment in self.query(db, eager).filter(_EXPERIMENT_SAMPLE_IDS).params(sample_ids=sample_ids).all():
+            grouped[experiment.sample_id].append(experiment)
+        return grouped
+    
+    def get_by_experiment_accession(self, db: Session, experiment_accession: str, eager: Optional[Sequence[str]] = None) -> Optional[Experiment]:
         """Get experiment by experiment accession."""
-        return db.query(Experiment).filter(Experiment.experiment_accession == experiment_accession).first()
+        return self.query(db, eager).filter(Experiment.experiment_accession == experiment_accession).first()
     
-    def get_by_run_accession(self, db: Session, run_accession: str) -> Optional[Experiment]:
+    def get_by_run_accession(self, db: Session, run_accession: str, eager: Optional[Sequence[str]] = None) -> Optional[Experiment]:
         """Get experiment by run accession."""
-        return db.query(Experiment).filter(Experiment.run_accession == run_accession).first()
-    
-    def get_multi_with_filters(
-        self, 
-        db: Session, 
-        *, 
-        skip: int = 0, 
-        limit: int = 100,
-        sample_id: Optional[UUID] = None,
-        experiment_accession: Optional[str] = None,
-        run_accession: Optional[str] = None,
-        experiment_type: Optional[str] = None
-    ) -> List[Experiment]:
-        """Get experiments with filters."""
-        query = db.query(Experiment)
-        if sample_id:
-            query = query.filter(Experiment.sample_id == sample_id)
-        if experiment_accession:
-            query = query.filter(Experiment.experiment_accession == experiment_accession)
-        if run_accession:
-            query = query.filter(Experiment.run_accession == run_accession)
-        if experiment_type:
-            query = query.filter(Experiment.experiment_type == experiment_type)
-        return query.offset(skip).limit(limit).all()
+        return self.query(db, eager).filter(Experiment.run_accession == run_accession).first()
 
 
 class ExperimentSubmissionService(BaseService[ExperimentSubmission, ExperimentCreate, ExperimentUpdate]):
     """Service for ExperimentSubmission operations."""
     
-    def get_by_experiment_id(self, db: Session, experiment_id: UUID) -> List[ExperimentSubmission]:
+    def get_by_experiment_id(self, db: Session, experiment_id: UUID, eager: Optional[Sequence[str]] = None) -> List[ExperimentSubmission]:
         """Get submission experiments by experiment ID."""
-        return db.query(ExperimentSubmission).filter(ExperimentSubmission.experiment_id == experiment_id).all()
+        return self.query(db, eager).filter(_EXPERIMENT_SUBMISSION_EXPERIMENT_ID).params(experiment_id=experiment_id).all()
 
 
 class ExperimentFetchedService(BaseService[ExperimentFetched, ExperimentCreate, ExperimentUpdate]):
     """Service for ExperimentFetched operations."""
     
-    def get_by_experiment_id(self, db: Session, experiment_id: UUID) -> List[ExperimentFetched]:
+    def get_by_experiment_id(self, db: Session, experiment_id: UUID, eager: Optional[Sequence[str]] = None) -> List[ExperimentFetched]:
         """Get fetched experiments by experiment ID."""
-        return db.query(ExperimentFetched).filter(ExperimentFetched.experiment_id == experiment_id).all()
+        return self.query(db, eager).filter(_EXPERIMENT_FETCHED_EXPERIMENT_ID).params(experiment_id=experiment_id).all()
 
 
 experiment_service = ExperimentService(Experiment)
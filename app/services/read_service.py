@@ -1,52 +1,53 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from uuid import UUID
 
+from sqlalchemy import bindparam
 from sqlalchemy.orm import Session
 
 from app.models.read import Read
 from app.schemas.read import ReadCreate, ReadUpdate
 from app.services.base_service import BaseService
 
+_READ_EXPERIMENT_ID = Read.experiment_id == bindparam("experiment_id")
+_READ_EXPERIMENT_IDS = Read.experiment_id.in_(bindparam("experiment_ids", expanding=True))
+
 
 class ReadService(BaseService[Read, ReadCreate, ReadUpdate]):
     """Service for Read operations."""
+
+    _filter_map = {
+        "experiment_id": _READ_EXPERIMENT_ID,
+        "file_format": Read.file_format == bindparam("file_format"),
+    }
     
-    def get_by_experiment_id(self, db: Session, experiment_id: UUID) -> List[Read]:
+    def get_by_experiment_id(self, db: Session, experiment_id: UUID, eager: Optional[Sequence[str]] = None) -> List[Read]:
         """Get reads by experiment ID."""
-        return db.query(Read).filter(Read.experiment_id == experiment_id).all()
+        return self.query(db, eager).filter(_READ_EXPERIMENT_ID).params(experiment_id=experiment_id).all()
     
-    def get_by_bpa_dataset_id(self, db: Session, bpa_dataset_id: str) -> List[Read]:
+    def get_many_by_experiment_ids(self, db: Session, experiment_ids: List[UUID], eager: Optional[Sequence[str]] = None) -> Dict[UUID, List[Read]]:
+        """Get reads for several experiments in one query, grouped by experiment ID."""
+        grouped: Dict[UUID, List[Read]] = {experiment_id: [] for experiment_id in experiment_ids}
+        if not experiment_ids:
+            return grouped
+        for read in self.query(db, eager).filter(_READ_EXPERIMENT_IDS).params(experiment_ids=experiment_ids).all():
+            grouped[read.experiment_id].append(read)
+        return grouped
+    
+    def get_by_bpa_dataset_id(self, db: Session, bpa_dataset_id: str, eager: Optional[Sequence[str]] = None) -> List[Read]:
         """Get reads by dataset name."""
-        return db.query(Read).filter(Read.bpa_dataset_id == bpa_dataset_id).all()
+        return self.query(db, eager).filter(Read.bpa_dataset_id == bpa_dataset_id).all()
     
-    def get_by_bpa_resource_id(self, db: Session, bpa_resource_id: str) -> List[Read]:
+    def get_by_bpa_resource_id(self, db: Session, bpa_resource_id: str, eager: Optional[Sequence[str]] = None) -> List[Read]:
         """Get reads by resource name."""
-        return db.query(Read).filter(Read.bpa_resource_id == bpa_resource_id).all()
+        return self.query(db, eager).filter(Read.bpa_resource_id == bpa_resource_id).all()
     
-    def get_by_file_name(self, db: Session, file_name: str) -> List[Read]:
+    def get_by_file_name(self, db: Session, file_name: str, eager: Optional[Sequence[str]] = None) -> List[Read]:
         """Get reads by file name."""
-        return db.query(Read).filter(Read.file_name == file_name).all()
+        return self.query(db, eager).filter(Read.file_name == file_name).all()
     
-    def get_by_file_checksum(self, db: Session, file_checksum: str) -> Optional[Read]:
+    def get_by_file_checksum(self, db: Session, file_checksum: str, eager: Optional[Sequence[str]] = None) -> Optional[Read]:
         """Get read by file MD5."""
-        return db.query(Read).filter(Read.file_checksum == file_checksum).first()
-    
-    def get_multi_with_filters(
-        self, 
-        db: Session, 
-        *, 
-        skip: int = 0, 
-        limit: int = 100,
-        experiment_id: Optional[UUID] = None,
-        file_format: Optional[str] = None
-    ) -> List[Read]:
-        """Get reads with filters."""
-        query = db.query(Read)
-        if experiment_id:
-            query = query.filter(Read.experiment_id == experiment_id)
-        if file_format:
-            query = query.filter(Read.file_format == file_format)
-        return query.offset(skip).limit(limit).all()
+        return self.query(db, eager).filter(Read.file_checksum == file_checksum).first()
 
 
 read_service = ReadService(Read)
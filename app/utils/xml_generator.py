@@ -4,17 +4,244 @@ XML generation utilities for ENA submissions.
 This module provides functions to generate XML files for various ENA submission types
 (samples, experiments, runs, etc.) from the internal JSON representation.
 """
-import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom
-from typing import Dict, Any, List, Optional
-from app.models.organism import Organism
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from app.core.dependencies import get_db
+import atexit
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from itertools import chain
+from io import StringIO
+from typing import TYPE_CHECKING, Callable, Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape
 
+if TYPE_CHECKING:
+    from app.models.organism import Organism
 
-def generate_sample_xml(organism: Organism, submission_json: Dict[str, Any], alias: str, center_name: str = "AToL", 
-                       broker_name: str = "AToL", accession: Optional[str] = None) -> str:
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+# Bulk generators only fan out to worker processes for at least this many records
+PARALLEL_MIN_RECORDS = 200
+
+# Size of the shared worker pool used by the bulk generators when max_workers is given
+PARALLEL_POOL_SIZE = os.cpu_count() or 1
+
+# Defaults applied when the submission JSON does not specify a value
+DEFAULT_LIBRARY_LAYOUT = "SINGLE"
+CHECKSUM_METHOD = "MD5"
+
+# Sample JSON keys that are written as dedicated elements rather than SAMPLE_ATTRIBUTEs
+SAMPLE_SKIP_KEYS = frozenset(("title", "taxon_id", "scientific_name", "common_name", "description", "alias"))
+
+# Sample attributes reported in decimal degrees
+GEO_UNIT_KEYS = frozenset(("geographic location (latitude)", "geographic location (longitude)"))
+
+# LIBRARY_DESCRIPTOR text children in schema order as (tag, _ExperimentRecord field, optional,
+# cached); optional elements are omitted when unset, and cached ones hold vocabulary terms
+# that repeat across a batch
+LIBRARY_DESCRIPTOR_FIELDS = (
+    ("LIBRARY_NAME", "library_name", True, False),
+    ("LIBRARY_STRATEGY", "library_strategy", False, True),
+    ("LIBRARY_SOURCE", "library_source", False, True),
+    ("LIBRARY_SELECTION", "library_selection", False, True),
+    ("LIBRARY_CONSTRUCTION_PROTOCOL", "library_construction_protocol", True, False),
+    ("INSERT_SIZE", "insert_size", False, False),
+)
+
+# Sequencing platforms accepted by the ENA experiment schema; the platform name is
+# written as an element tag, so nothing else may reach the XML
+ENA_PLATFORMS = frozenset((
+    "LS454", "ILLUMINA", "HELICOS", "ABI_SOLID", "COMPLETE_GENOMICS", "BGISEQ", "OXFORD_NANOPORE",
+    "PACBIO_SMRT", "ION_TORRENT", "CAPILLARY", "DNBSEQ", "ELEMENT", "ULTIMA", "VELA_DIAGNOSTICS",
+    "GENAPSYS", "GENEMIND", "TAPESTRI",
+))
+
+# Sample attributes added with a default value when the submission does not set them.
+# TO-DO map over mandatory ToL checklist fields and set to "not provided" if they don't yet exist;
+# for now collecting institution is the only such field, as it doesn't appear in the BPA data
+SAMPLE_ATTRIBUTE_DEFAULTS = (
+    ("ENA-CHECKLIST", "ERC000053"),
+    ("project name", "atol-genome-engine"),
+    ("collecting institution", "not provided"),
+)
+
+# Sample attributes whose value is at most this long are rendered through a shared cache;
+# short values such as countries, dates and "not provided" recur across a batch
+CACHED_VALUE_MAX_LEN = 64
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _shared_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool shared by all bulk generator calls, creating it on
+    first use. Its size is fixed, so concurrent callers queue for the same
+    PARALLEL_POOL_SIZE workers rather than each starting their own.
+
+    The pool lives until the interpreter exits, when it is shut down. It is meant
+    for batch scripts only and must not be started from the API process, whose
+    server workers would each hold on to a set of idle child processes.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PARALLEL_POOL_SIZE)
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def _map_shards(func: Callable[[List[Dict[str, Any]]], str], records: List[Dict[str, Any]],
+                max_workers: int) -> str:
+    """
+    Split records into one contiguous shard per worker, run func on each shard in
+    the shared process pool and join the results in the original order. Records
+    must already be picklable plain data.
+    """
+    shard_count = min(max_workers, PARALLEL_POOL_SIZE)
+    size = -(-len(records) // shard_count)
+    shards = [records[i:i + size] for i in range(0, len(records), size)]
+    return "".join(_shared_pool().map(func, shards))
+
+
+_TEXT_ENTITIES = {"\r": "&#13;"}
+_ATTR_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"}
+
+# Characters outside the XML 1.0 Char production, which lxml refuses in text and attributes
+_ILLEGAL_XML_CHARS = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def _check_xml_chars(value: str) -> None:
+    """
+    Reject a string that cannot appear in an XML document, as lxml does when it is
+    assigned to an element.
+    """
+    if _ILLEGAL_XML_CHARS.search(value) is not None:
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+
+
+def _escape_text(value: str) -> str:
+    """
+    Escape element text the same way lxml serializes it.
+    """
+    _check_xml_chars(value)
+    return escape(value, _TEXT_ENTITIES)
+
+
+def _quote_attr(value: str) -> str:
+    """
+    Escape and double-quote an attribute value the same way lxml serializes it.
+    """
+    _check_xml_chars(value)
+    return '"' + escape(value, _ATTR_ENTITIES) + '"'
+
+
+@lru_cache(maxsize=32)
+def _quote_static_attr(value: str) -> str:
+    """
+    Quote an attribute value that repeats across records, such as the center name,
+    study reference or file type.
+    """
+    return _quote_attr(value)
+
+
+@lru_cache(maxsize=4096)
+def _escape_static_text(value: str) -> str:
+    """
+    Escape element text that repeats across records, such as sample attribute tags.
+    """
+    return _escape_text(value)
+
+
+def _as_text(value: Any) -> Optional[str]:
+    """
+    Convert an optional JSON scalar to element text, skipping str() for strings.
+    """
+    if value is None or type(value) is str:
+        return value
+    return str(value)
+
+
+class _OrganismNames(NamedTuple):
+    """
+    Plain copy of the Organism fields written into SAMPLE_NAME, sent to worker
+    processes in place of the ORM instance.
+    """
+    tax_id: Any
+    scientific_name: Optional[str]
+    common_name: Optional[str]
+
+    @classmethod
+    def of(cls, organism: "Organism") -> "_OrganismNames":
+        return cls(organism.tax_id, organism.scientific_name, organism.common_name)
+
+
+class _Layout(NamedTuple):
+    """
+    Line break and per-depth indentation used by the text writers.
+    """
+    newline: str
+    indent: Tuple[str, ...]
+
+
+# Indented output puts every element on its own line, two spaces per level, as lxml's
+# pretty_print does; compact output has no whitespace between elements
+_PRETTY = _Layout("\n", tuple("  " * depth for depth in range(6)))
+_COMPACT = _Layout("", ("",) * 6)
+
+
+def _layout(pretty: bool) -> _Layout:
+    """
+    Return the layout for indented or compact output.
+    """
+    return _PRETTY if pretty else _COMPACT
+
+
+def _text_element(indent: str, tag: str, text: Optional[str], newline: str) -> str:
+    """
+    Render a leaf element, self-closing when it has no text.
+    """
+    if text is None:
+        return f"{indent}<{tag}/>{newline}"
+    return f"{indent}<{tag}>{_escape_text(text)}</{tag}>{newline}"
+
+
+# Leaf elements whose text repeats across records, such as the library strategy or
+# instrument model
+_static_text_element = lru_cache(maxsize=1024)(_text_element)
+
+
+def _write_text_element(write: Callable[[str], Any], indent: str, tag: str, text: Optional[str],
+                        newline: str) -> None:
+    """
+    Write a leaf element, self-closing when it has no text.
+    """
+    write(_text_element(indent, tag, text, newline))
+
+
+def _write_record_head(write: Callable[[str], Any], layout: _Layout, tag: str, alias: str, center_name: str,
+                       broker_name: str, accession: Optional[str]) -> None:
+    """
+    Write the opening tag and IDENTIFIERS of a SAMPLE, EXPERIMENT or RUN element.
+    """
+    newline, indent = layout
+    center = _quote_static_attr(center_name)
+    write(f"{indent[1]}<{tag} alias={_quote_attr(alias)} center_name={center} "
+          f"broker_name={_quote_static_attr(broker_name)}")
+    if accession:
+        write(f" accession={_quote_attr(accession)}")
+    write(f">{newline}{indent[2]}<IDENTIFIERS>{newline}")
+    if accession:
+        _write_text_element(write, indent[3], "PRIMARY_ID", accession, newline)
+    write(f"{indent[3]}<SUBMITTER_ID namespace={center}>{_escape_text(alias)}</SUBMITTER_ID>{newline}")
+    write(f"{indent[2]}</IDENTIFIERS>{newline}")
+
+
+def generate_sample_xml(organism: "Organism", submission_json: Dict[str, Any], alias: str, center_name: str = "AToL", 
+                       broker_name: str = "AToL", accession: Optional[str] = None, pretty: bool = False) -> str:
     """
     Generate ENA sample XML from submission JSON data.
     
@@ -24,117 +251,304 @@ def generate_sample_xml(organism: Organism, submission_json: Dict[str, Any], ali
         center_name: Center name for the submission
         broker_name: Broker name for the submission
         accession: Optional accession number if the sample is already registered
+        pretty: Indent the output for reading; ENA only needs well-formed XML
         
     Returns:
         String containing the XML representation of the sample
     """
-    # Create root element
-    sample_set = ET.Element("SAMPLE_SET")
-    
-    # Create sample element with core attributes
-    sample = ET.SubElement(sample_set, "SAMPLE")
-    sample.set("alias", alias)
-    sample.set("center_name", center_name)
-    sample.set("broker_name", broker_name)
-    if accession:
-        sample.set("accession", accession)
-    
-    identifiers = ET.SubElement(sample, "IDENTIFIERS")
-    if accession:
-        primary_id = ET.SubElement(identifiers, "PRIMARY_ID")
-        primary_id.text = accession
-    
-    submitter_id = ET.SubElement(identifiers, "SUBMITTER_ID")
-    submitter_id.set("namespace", center_name)
-    submitter_id.text = alias
-    
-    title = ET.SubElement(sample, "TITLE")
-    title.text = submission_json.get("title", f"{alias}")
-    
-    sample_name = ET.SubElement(sample, "SAMPLE_NAME")
-    
-    taxon_id = ET.SubElement(sample_name, "TAXON_ID")
-    taxon_id.text = str(organism.tax_id)
-    
-    scientific_name = ET.SubElement(sample_name, "SCIENTIFIC_NAME")
-    scientific_name.text = organism.scientific_name
-    
-    common_name = ET.SubElement(sample_name, "COMMON_NAME")
-    common_name.text = organism.common_name
-    
-    if "description" in submission_json:
-        description = ET.SubElement(sample, "DESCRIPTION")
-        description.text = submission_json["description"]
+    layout = _layout(pretty)
+    buffer = StringIO()
+    buffer.write(XML_DECLARATION + "<SAMPLE_SET>" + layout.newline)
+    _write_sample(buffer.write, layout, organism, submission_json, alias, center_name, broker_name, accession)
+    buffer.write("</SAMPLE_SET>" + layout.newline)
+    return buffer.getvalue()
+
+
+def _write_samples(write: Callable[[str], Any], layout: _Layout, samples_data: Iterable[Dict[str, Any]]) -> None:
+    """
+    Write the SAMPLE elements for a sequence of samples.
+    """
+    for sample_data in samples_data:
+        _write_sample(
+            write,
+            layout,
+            organism=sample_data["organism"],
+            submission_json=sample_data["submission_json"],
+            alias=sample_data["alias"],
+            center_name=sample_data.get("center_name", "AToL"),
+            broker_name=sample_data.get("broker_name", "AToL"),
+            accession=sample_data.get("accession")
+        )
+
+
+def _write_samples_shard(samples_data: List[Dict[str, Any]], layout: _Layout) -> str:
+    """
+    Write the SAMPLE elements for a list of samples and return the text.
+    """
+    buffer = StringIO()
+    _write_samples(buffer.write, layout, samples_data)
+    return buffer.getvalue()
+
+
+def generate_samples_xml_to(out: TextIO, samples_data: Iterable[Dict[str, Any]], pretty: bool = False) -> None:
+    """
+    Write ENA sample XML for multiple samples to a text stream.
     
-    # Add sample attributes
-    sample_attributes = ET.SubElement(sample, "SAMPLE_ATTRIBUTES")
+    Each SAMPLE element is written as soon as it is built, so samples_data can be
+    a generator and the document is never held in memory as a whole.
     
-    # Skip these keys as they are handled separately
-    skip_keys = ["title", "taxon_id", "scientific_name", "common_name", "description", "alias"]
+    Args:
+        out: Writable text stream, e.g. a file opened in text mode
+        samples_data: Iterable of sample dictionaries, as for generate_samples_xml
+        pretty: Indent the output for reading; ENA only needs well-formed XML
+    """
+    layout = _layout(pretty)
+    samples = iter(samples_data)
+    first = next(samples, None)
+    if first is None:
+        out.write(XML_DECLARATION + "<SAMPLE_SET/>" + layout.newline)
+        return
+    
+    out.write(XML_DECLARATION + "<SAMPLE_SET>" + layout.newline)
+    _write_samples(out.write, layout, chain((first,), samples))
+    out.write("</SAMPLE_SET>" + layout.newline)
+
+
+def generate_samples_xml(samples_data: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                         pretty: bool = False) -> str:
+    """
+    Generate ENA sample XML for multiple samples.
     
-    # Process all other keys as sample attributes
+    Args:
+        samples_data: List of dictionaries, each containing:
+            - organism: Organism the sample belongs to
+            - submission_json: Dictionary with the sample data
+            - alias: Sample alias
+            - accession: Optional accession number
+            - center_name / broker_name: Optional, default "AToL"
+        max_workers: Optional number of worker processes; when greater than one, large
+            batches are split across up to this many workers of the shared pool. Only
+            for offline batch jobs; request handlers must leave it unset
+        pretty: Indent the output for reading; ENA only needs well-formed XML
+            
+    Returns:
+        XML string in ENA sample format
+    """
+    if max_workers and max_workers > 1 and len(samples_data) >= PARALLEL_MIN_RECORDS:
+        layout = _layout(pretty)
+        # Send the workers the organism names rather than pickling ORM instances
+        records = [dict(sample_data, organism=_OrganismNames.of(sample_data["organism"]))
+                   for sample_data in samples_data]
+        body = _map_shards(partial(_write_samples_shard, layout=layout), records, max_workers)
+        return XML_DECLARATION + "<SAMPLE_SET>" + layout.newline + body + "</SAMPLE_SET>" + layout.newline
+    
+    buffer = StringIO()
+    generate_samples_xml_to(buffer, samples_data, pretty)
+    return buffer.getvalue()
+
+
+def _sample_attributes(submission_json: Dict[str, Any]) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Yield the (tag, value, units) of each SAMPLE_ATTRIBUTE in document order: every
+    key not written as a dedicated element, skipping unset and empty values, which
+    carry no information for ENA, then the checklist defaults the submission did not set.
+    """
+    seen_tags = set()
     for key, value in submission_json.items():
-        if key in skip_keys:
+        if key in SAMPLE_SKIP_KEYS or value is None or value == "":
             continue
+        yield key, value if type(value) is str else str(value), "DD" if key in GEO_UNIT_KEYS else None
+        seen_tags.add(key)
+    
+    for tag, default in SAMPLE_ATTRIBUTE_DEFAULTS:
+        if tag not in seen_tags:
+            yield tag, default, None
 
-        if value is None:
-            continue
-            
-        attribute = ET.SubElement(sample_attributes, "SAMPLE_ATTRIBUTE")
-        
-        tag = ET.SubElement(attribute, "TAG")
-        tag.text = key
-        
-        val = ET.SubElement(attribute, "VALUE")
-        val.text = str(value)
-        
-        if key == "geographic location (latitude)" or key == "geographic location (longitude)":
-            units = ET.SubElement(attribute, "UNITS")
-            units.text = "DD"
 
-    # Check if ENA-CHECKLIST exists before adding it in
-    checklist_found = any(attr.find("TAG").text == "ENA-CHECKLIST" 
-                         for attr in sample_attributes.findall("SAMPLE_ATTRIBUTE"))
-    
-    if not checklist_found:
-        checklist_attr = ET.SubElement(sample_attributes, "SAMPLE_ATTRIBUTE")
-        tag = ET.SubElement(checklist_attr, "TAG")
-        tag.text = "ENA-CHECKLIST"
-        val = ET.SubElement(checklist_attr, "VALUE")
-        val.text = "ERC000053"
-    
-    # Check project name does not exist before adding it in
-    project_name_found = any(attr.find("TAG").text == "project name" 
-                         for attr in sample_attributes.findall("SAMPLE_ATTRIBUTE"))
-    
-    if not project_name_found:
-        project_name_attr = ET.SubElement(sample_attributes, "SAMPLE_ATTRIBUTE")
-        tag = ET.SubElement(project_name_attr, "TAG")
-        tag.text = "project name"
-        val = ET.SubElement(project_name_attr, "VALUE")
-        val.text = "atol-genome-engine"
-
-    # TO-DO map over mandatory ToL checklist fields and set to "not provided" if they don't yet exist
-    # For now, I'm manually adding in a field which doesn't appear in the BPA data:
-
-    # 1. Add collecting institution attribute if not already present
-    collecting_institution_found = any(attr.find("TAG").text == "collecting institution" 
-                         for attr in sample_attributes.findall("SAMPLE_ATTRIBUTE"))
-    
-    if not collecting_institution_found:
-        collecting_institution_attr = ET.SubElement(sample_attributes, "SAMPLE_ATTRIBUTE")
-        tag = ET.SubElement(collecting_institution_attr, "TAG")
-        tag.text = "collecting institution"
-        val = ET.SubElement(collecting_institution_attr, "VALUE")
-        val.text = "not provided"
+def _sample_attribute_text(tag: str, value: str, units: Optional[str], layout: _Layout) -> str:
+    """
+    Render one SAMPLE_ATTRIBUTE element as XML text.
+    """
+    newline, indent = layout
+    units_line = "" if units is None else f"{indent[4]}<UNITS>{units}</UNITS>{newline}"
+    return (f"{indent[3]}<SAMPLE_ATTRIBUTE>{newline}{indent[4]}<TAG>{_escape_static_text(tag)}</TAG>{newline}"
+            f"{indent[4]}<VALUE>{_escape_text(value)}</VALUE>{newline}{units_line}"
+            f"{indent[3]}</SAMPLE_ATTRIBUTE>{newline}")
+
+
+# Short tag/value pairs such as ("geo_loc_name", "Australia") recur across a batch
+_cached_sample_attribute_text = lru_cache(maxsize=4096)(_sample_attribute_text)
+
+
+def _write_sample_attribute(write: Callable[[str], Any], layout: _Layout, tag: str, value: str,
+                            units: Optional[str] = None) -> None:
+    """
+    Write one SAMPLE_ATTRIBUTE element, taking short values from the shared cache.
+    """
+    if len(value) <= CACHED_VALUE_MAX_LEN:
+        write(_cached_sample_attribute_text(tag, value, units, layout))
+    else:
+        write(_sample_attribute_text(tag, value, units, layout))
+
+
+def _write_sample(write: Callable[[str], Any], layout: _Layout, organism: "Organism", submission_json: Dict[str, Any],
+                  alias: str, center_name: str = "AToL", broker_name: str = "AToL",
+                  accession: Optional[str] = None) -> None:
+    """
+    Write a SAMPLE element as XML text.
+
+    The organism supplies SAMPLE_NAME; every other key of submission_json that is
+    not a dedicated element becomes a SAMPLE_ATTRIBUTE, followed by any checklist
+    defaults it does not set.
+    """
+    newline, indent = layout
+    _write_record_head(write, layout, "SAMPLE", alias, center_name, broker_name, accession)
+    _write_text_element(write, indent[2], "TITLE", submission_json.get("title", alias), newline)
+    write(f"{indent[2]}<SAMPLE_NAME>{newline}")
+    write(_static_text_element(indent[3], "TAXON_ID", str(organism.tax_id), newline))
+    write(_static_text_element(indent[3], "SCIENTIFIC_NAME", organism.scientific_name, newline))
+    # COMMON_NAME is optional in the ENA schema, so omit it when unset
+    if organism.common_name:
+        write(_static_text_element(indent[3], "COMMON_NAME", organism.common_name, newline))
+    write(f"{indent[2]}</SAMPLE_NAME>{newline}")
+    description = submission_json.get("description")
+    if description is not None:
+        _write_text_element(write, indent[2], "DESCRIPTION", description, newline)
+    
+    write(f"{indent[2]}<SAMPLE_ATTRIBUTES>{newline}")
+    for tag, value, units in _sample_attributes(submission_json):
+        _write_sample_attribute(write, layout, tag, value, units)
+    write(f"{indent[2]}</SAMPLE_ATTRIBUTES>{newline}{indent[1]}</SAMPLE>{newline}")
+
+
+def _normalize_platform(platform: Any) -> Optional[str]:
+    """
+    Return the platform stripped and upper-cased, or None if it is unset.
+
+    Raises ValueError for a platform that is not one of ENA_PLATFORMS.
+    """
+    if isinstance(platform, str):
+        normalized = platform.strip().upper()
+        if not normalized:
+            return None
+        if normalized in ENA_PLATFORMS:
+            return normalized
+    elif platform is None:
+        return None
+    raise ValueError(f"Unsupported sequencing platform: {platform}")
+
+
+@dataclass(slots=True)
+class _ExperimentRecord:
+    """
+    Fields of an experiment's submission JSON read by _write_experiment.
+    """
+    title: str
+    design_description: Optional[str]
+    library_name: Optional[str]
+    library_strategy: Optional[str]
+    library_source: Optional[str]
+    library_selection: Optional[str]
+    library_construction_protocol: Optional[str]
+    insert_size: Optional[str]
+    library_layout: str
+    nominal_length: Optional[str]
+    platform: Optional[str]
+    instrument_model: Optional[str]
+
+    @classmethod
+    def from_json(cls, submission_json: Dict[str, Any], alias: str) -> "_ExperimentRecord":
+        get = submission_json.get
+        platform = _normalize_platform(get("platform"))
+        return cls(
+            title=get("title", alias),
+            design_description=get("design_description") or None,
+            library_name=get("library_name"),
+            library_strategy=get("library_strategy"),
+            library_source=get("library_source"),
+            library_selection=get("library_selection"),
+            library_construction_protocol=get("library_construction_protocol"),
+            insert_size=_as_text(get("insert_size")),
+            library_layout=get("library_layout", DEFAULT_LIBRARY_LAYOUT),
+            nominal_length=_as_text(get("nominal_length")),
+            platform=platform,
+            instrument_model=get("instrument_model"),
+        )
+
+
+def _write_experiment(write: Callable[[str], Any], layout: _Layout, submission_json: Dict[str, Any], alias: str,
+                      study_accession: Optional[str] = None, study_alias: Optional[str] = None,
+                      sample_accession: Optional[str] = None, sample_alias: Optional[str] = None,
+                      center_name: str = "AToL", broker_name: str = "AToL", accession: Optional[str] = None) -> None:
+    """
+    Write an EXPERIMENT element as XML text.
+
+    The study and sample references are resolved and the platform checked before
+    anything is written, so an invalid experiment raises ValueError without leaving
+    a partial element in the output.
+    """
+    if study_accession:
+        study_ref = f"accession={_quote_static_attr(study_accession)}"
+    elif study_alias:
+        study_ref = f"refname={_quote_static_attr(study_alias)}"
+    else:
+        raise ValueError("Study accession or refname must be provided")
     
-    rough_string = ET.tostring(sample_set, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ", encoding="UTF-8").decode('UTF-8')
+    if sample_accession:
+        sample_ref = f"accession={_quote_attr(sample_accession)}"
+    elif sample_alias:
+        sample_ref = f"refname={_quote_attr(sample_alias)}"
+    else:
+        raise ValueError("Sample accession or refname must be provided")
+    
+    record = _ExperimentRecord.from_json(submission_json, alias)
+    
+    newline, indent = layout
+    _write_record_head(write, layout, "EXPERIMENT", alias, center_name, broker_name, accession)
+    _write_text_element(write, indent[2], "TITLE", record.title, newline)
+    write(f"{indent[2]}<STUDY_REF {study_ref}/>{newline}{indent[2]}<DESIGN>{newline}")
+    _write_text_element(write, indent[3], "DESIGN_DESCRIPTION", record.design_description, newline)
+    write(f"{indent[3]}<SAMPLE_DESCRIPTOR {sample_ref}/>{newline}{indent[3]}<LIBRARY_DESCRIPTOR>{newline}")
+    for tag, field, optional, cached in LIBRARY_DESCRIPTOR_FIELDS:
+        value = getattr(record, field)
+        if optional and not value:
+            continue
+        if cached:
+            write(_static_text_element(indent[4], tag, value, newline))
+        else:
+            _write_text_element(write, indent[4], tag, value, newline)
+    write(f"{indent[4]}<LIBRARY_LAYOUT>{newline}")
+    if record.library_layout == "PAIRED":
+        if record.nominal_length is not None:
+            write(f"{indent[5]}<PAIRED NOMINAL_LENGTH={_quote_attr(record.nominal_length)}/>{newline}")
+        else:
+            write(f"{indent[5]}<PAIRED/>{newline}")
+    else:
+        write(f"{indent[5]}<SINGLE/>{newline}") #TODO check if this is correct
+    write(f"{indent[4]}</LIBRARY_LAYOUT>{newline}{indent[3]}</LIBRARY_DESCRIPTOR>{newline}"
+          f"{indent[2]}</DESIGN>{newline}")
+    # The platform name is the element tag, so there is nothing to write without one
+    if record.platform:
+        write(_platform_text(record.platform, record.instrument_model, layout))
+    write(f"{indent[1]}</EXPERIMENT>{newline}")
+
+
+@lru_cache(maxsize=64)
+def _platform_text(platform: str, instrument_model: Optional[str], layout: _Layout) -> str:
+    """
+    Render the PLATFORM block of an EXPERIMENT; batches use only a handful of
+    platform and instrument combinations.
+    """
+    newline, indent = layout
+    return (f"{indent[2]}<PLATFORM>{newline}{indent[3]}<{platform}>{newline}"
+            + _static_text_element(indent[4], "INSTRUMENT_MODEL", instrument_model, newline)
+            + f"{indent[3]}</{platform}>{newline}{indent[2]}</PLATFORM>{newline}")
+
 
 def generate_experiment_xml(submission_json: Dict[str, Any], alias: str, study_accession: Optional[str] = None,
                           study_alias: Optional[str] = None, sample_accession: Optional[str] = None, sample_alias: Optional[str] = None,
-                          center_name: str = "AToL", broker_name: str = "AToL", accession: Optional[str] = None) -> str:
+                          center_name: str = "AToL", broker_name: str = "AToL", accession: Optional[str] = None,
+                          pretty: bool = False) -> str:
     """
     Generate ENA experiment XML from submission JSON data.
     
@@ -144,172 +558,181 @@ def generate_experiment_xml(submission_json: Dict[str, Any], alias: str, study_a
         center_name: Center name for the submission
         broker_name: Broker name for the submission
         accession: Optional accession number if the experiment is already registered
+        pretty: Indent the output for reading; ENA only needs well-formed XML
         
     Returns:
         String containing the XML representation of the experiment
+
+    Raises:
+        ValueError: If the study or sample reference is missing or the platform is unsupported
     """
-    experiment_set = ET.Element("EXPERIMENT_SET")
-    
-    experiment = ET.SubElement(experiment_set, "EXPERIMENT")
-    experiment.set("alias", alias)
-    experiment.set("center_name", center_name)
-    experiment.set("broker_name", broker_name)
-    if accession:
-        experiment.set("accession", accession)
-    
-    identifiers = ET.SubElement(experiment, "IDENTIFIERS")
-    if accession:
-        primary_id = ET.SubElement(identifiers, "PRIMARY_ID")
-        primary_id.text = accession
-    
-    submitter_id = ET.SubElement(identifiers, "SUBMITTER_ID")
-    submitter_id.set("namespace", center_name)
-    submitter_id.text = alias
-    
-    title = ET.SubElement(experiment, "TITLE")
-    title.text = submission_json.get("title", alias)
-    
-    study_ref = ET.SubElement(experiment, "STUDY_REF")
-    if study_accession:
-        study_ref.set("accession", study_accession)
-    elif study_alias:
-        study_ref.set("refname", study_alias)
-    else:
-        raise HTTPException(status_code=400, detail="Study accession or refname must be provided")
-    
-    design = ET.SubElement(experiment, "DESIGN")
-    
-    design_description = ET.SubElement(design, "DESIGN_DESCRIPTION")
-    design_description.text = submission_json.get("design_description", "")
-    
-    sample_descriptor = ET.SubElement(design, "SAMPLE_DESCRIPTOR")
-    if sample_accession:
-        sample_descriptor.set("accession", sample_accession)
-    elif sample_alias:
-        sample_descriptor.set("refname", sample_alias)
-    else:
-        raise HTTPException(status_code=400, detail="Sample accession or refname must be provided")
-    
-    library_descriptor = ET.SubElement(design, "LIBRARY_DESCRIPTOR")
-    
-    library_name = ET.SubElement(library_descriptor, "LIBRARY_NAME")
-    library_name.text = submission_json.get("library_name", None)
-    
-    library_strategy = ET.SubElement(library_descriptor, "LIBRARY_STRATEGY")
-    library_strategy.text = submission_json.get("library_strategy", None)
-    
-    library_source = ET.SubElement(library_descriptor, "LIBRARY_SOURCE")
-    library_source.text = submission_json.get("library_source", None)
-    
-    library_selection = ET.SubElement(library_descriptor, "LIBRARY_SELECTION")
-    library_selection.text = submission_json.get("library_selection", None)
-    
-    library_construction_protocol = ET.SubElement(library_descriptor, "LIBRARY_CONSTRUCTION_PROTOCOL")
-    library_construction_protocol.text = submission_json.get("library_construction_protocol", None)
-
-    insert_size = ET.SubElement(library_descriptor, "INSERT_SIZE")
-    insert_size.text = submission_json.get("insert_size", None)
-
-    library_layout = ET.SubElement(library_descriptor, "LIBRARY_LAYOUT")
-    layout_type = submission_json.get("library_layout", "SINGLE")
-    if layout_type == "PAIRED":
-        ET.SubElement(library_layout, "PAIRED")
-        if "nominal_length" in submission_json:
-            paired = library_layout.find("PAIRED")
-            paired.set("NOMINAL_LENGTH", str(submission_json["nominal_length"]))
-    else:
-        ET.SubElement(library_layout, "SINGLE") #TODO check if this is correct
-    
-    platform = ET.SubElement(experiment, "PLATFORM")
-    platform_type = submission_json.get("platform", None)
-    platform_element = ET.SubElement(platform, platform_type)
-    
-    instrument_model = ET.SubElement(platform_element, "INSTRUMENT_MODEL")
-    instrument_model.text = submission_json.get("instrument_model", None)
-    
-    rough_string = ET.tostring(experiment_set, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ", encoding="UTF-8").decode('UTF-8')
+    layout = _layout(pretty)
+    buffer = StringIO()
+    buffer.write(XML_DECLARATION + "<EXPERIMENT_SET>" + layout.newline)
+    _write_experiment(buffer.write, layout, submission_json, alias, study_accession, study_alias,
+                      sample_accession, sample_alias, center_name, broker_name, accession)
+    buffer.write("</EXPERIMENT_SET>" + layout.newline)
+    return buffer.getvalue()
 
-"""
-XML generation functions for ENA run submissions.
 
-This module provides utility functions to generate ENA-compliant XML for run submissions.
-"""
-from typing import Any, Dict, List, Optional
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+def _write_experiments(write: Callable[[str], Any], layout: _Layout, experiments_data: Iterable[Dict[str, Any]],
+                       study_accession: Optional[str] = None, study_alias: Optional[str] = None) -> None:
+    """
+    Write the EXPERIMENT elements for a sequence of experiments.
+    """
+    for experiment_data in experiments_data:
+        _write_experiment(
+            write,
+            layout,
+            submission_json=experiment_data["submission_json"],
+            alias=experiment_data["alias"],
+            study_accession=study_accession,
+            study_alias=study_alias,
+            sample_accession=experiment_data.get("sample_accession"),
+            sample_alias=experiment_data.get("sample_alias"),
+            center_name=experiment_data.get("center_name", "AToL"),
+            broker_name=experiment_data.get("broker_name", "AToL"),
+            accession=experiment_data.get("accession")
+        )
 
 
-def _create_run_element(submission_json: Dict[str, Any], alias: str, experiment_accession: Optional[str] = None,
-                      experiment_alias: Optional[str] = None, center_name: str = "AToL",
-                      broker_name: str = "AToL", accession: Optional[str] = None) -> ET.Element:
+def _write_experiments_shard(experiments_data: List[Dict[str, Any]], layout: _Layout,
+                             study_accession: Optional[str] = None, study_alias: Optional[str] = None) -> str:
     """
-    Helper function to create a RUN element with all its children.
-    
-    Args:
-        submission_json: Dictionary containing the run data
-        alias: Run alias
-        experiment_accession: Optional experiment accession
-        experiment_alias: Optional experiment alias/refname
-        center_name: Center name
-        broker_name: Broker name
-        accession: Optional run accession
-        
-    Returns:
-        XML Element for the RUN
+    Write the EXPERIMENT elements for a list of experiments and return the text.
     """
-    run = ET.Element("RUN")
-    run.set("alias", alias)
-    run.set("center_name", center_name)
-    run.set("broker_name", broker_name)
-    
-    if accession:
-        run.set("accession", accession)
-    
-    identifiers = ET.SubElement(run, "IDENTIFIERS")
-    
-    if accession:
-        primary_id = ET.SubElement(identifiers, "PRIMARY_ID")
-        primary_id.text = accession
+    buffer = StringIO()
+    _write_experiments(buffer.write, layout, experiments_data, study_accession, study_alias)
+    return buffer.getvalue()
+
+
+def generate_experiments_xml_to(out: TextIO, experiments_data: Iterable[Dict[str, Any]],
+                                study_accession: Optional[str] = None, study_alias: Optional[str] = None,
+                                pretty: bool = False) -> None:
+    """
+    Write ENA experiment XML for multiple experiments to a text stream.
     
-    submitter_id = ET.SubElement(identifiers, "SUBMITTER_ID")
-    submitter_id.text = alias
-    submitter_id.set("namespace", center_name)
+    Each EXPERIMENT element is written as soon as it is built, so experiments_data
+    can be a generator and the document is never held in memory as a whole.
     
-    experiment_ref = ET.SubElement(run, "EXPERIMENT_REF")
+    Args:
+        out: Writable text stream, e.g. a file opened in text mode
+        experiments_data: Iterable of experiment dictionaries, as for generate_experiments_xml
+        study_accession: Optional study accession shared by all experiments
+        study_alias: Optional study alias/refname shared by all experiments
+        pretty: Indent the output for reading; ENA only needs well-formed XML
+    """
+    layout = _layout(pretty)
+    experiments = iter(experiments_data)
+    first = next(experiments, None)
+    if first is None:
+        out.write(XML_DECLARATION + "<EXPERIMENT_SET/>" + layout.newline)
+        return
+    
+    out.write(XML_DECLARATION + "<EXPERIMENT_SET>" + layout.newline)
+    _write_experiments(out.write, layout, chain((first,), experiments), study_accession, study_alias)
+    out.write("</EXPERIMENT_SET>" + layout.newline)
+
+
+def generate_experiments_xml(experiments_data: List[Dict[str, Any]], study_accession: Optional[str] = None,
+                          study_alias: Optional[str] = None, max_workers: Optional[int] = None,
+                          pretty: bool = False) -> str:
+    """
+    Generate ENA experiment XML for multiple experiments.
     
-    exp_accession = experiment_accession or submission_json.get("experiment_accession")
-    exp_alias = experiment_alias or submission_json.get("experiment_alias")
+    Args:
+        experiments_data: List of dictionaries, each containing:
+            - submission_json: Dictionary with the experiment data
+            - alias: Experiment alias
+            - accession: Optional accession number
+            - sample_accession / sample_alias: Sample reference for the experiment
+        study_accession: Optional study accession shared by all experiments
+        study_alias: Optional study alias/refname shared by all experiments
+        max_workers: Optional number of worker processes; when greater than one, large
+            batches are split across up to this many workers of the shared pool. Only
+            for offline batch jobs; request handlers must leave it unset
+        pretty: Indent the output for reading; ENA only needs well-formed XML
+            
+    Returns:
+        XML string in ENA experiment format
+
+    Raises:
+        ValueError: If a study or sample reference is missing or a platform is unsupported
+    """
+    if max_workers and max_workers > 1 and len(experiments_data) >= PARALLEL_MIN_RECORDS:
+        layout = _layout(pretty)
+        write_shard = partial(_write_experiments_shard, layout=layout, study_accession=study_accession,
+                              study_alias=study_alias)
+        body = _map_shards(write_shard, experiments_data, max_workers)
+        return XML_DECLARATION + "<EXPERIMENT_SET>" + layout.newline + body + "</EXPERIMENT_SET>" + layout.newline
+    
+    buffer = StringIO()
+    generate_experiments_xml_to(buffer, experiments_data, study_accession, study_alias, pretty)
+    return buffer.getvalue()
+
+
+@dataclass(slots=True)
+class _RunRecord:
+    """
+    Fields of a run's submission JSON read by _write_run.
+    """
+    experiment_accession: Optional[str]
+    experiment_alias: Optional[str]
+    file_checksum: Optional[str]
+    file_name: Optional[str]
+    file_format: Optional[str]
+
+    @classmethod
+    def from_json(cls, submission_json: Dict[str, Any]) -> "_RunRecord":
+        get = submission_json.get
+        return cls(
+            experiment_accession=get("experiment_accession"),
+            experiment_alias=get("experiment_alias"),
+            file_checksum=get("file_checksum"),
+            file_name=get("file_name"),
+            file_format=get("file_format"),
+        )
+
+
+def _write_run(write: Callable[[str], Any], layout: _Layout, submission_json: Dict[str, Any], alias: str,
+               experiment_accession: Optional[str] = None, experiment_alias: Optional[str] = None,
+               center_name: str = "AToL", broker_name: str = "AToL", accession: Optional[str] = None) -> None:
+    """
+    Write a RUN element as XML text.
+
+    experiment_accession and experiment_alias override the reference in
+    submission_json; ValueError is raised before writing if neither gives one.
+    """
+    record = _RunRecord.from_json(submission_json)
+    exp_accession = experiment_accession or record.experiment_accession
+    exp_alias = experiment_alias or record.experiment_alias
     
     if exp_accession:
-        experiment_ref.set("accession", exp_accession)
+        experiment_ref = f"accession={_quote_attr(exp_accession)}"
     elif exp_alias:
-        experiment_ref.set("refname", exp_alias)
+        experiment_ref = f"refname={_quote_attr(exp_alias)}"
     else:
-        # Raise an error if neither experiment_accession nor experiment_alias is provided
-        raise HTTPException(status_code=400, detail="Experiment accession or alias must be provided")
-    
-    data_block = ET.SubElement(run, "DATA_BLOCK")
-    files = ET.SubElement(data_block, "FILES")
-    file_element = ET.SubElement(files, "FILE")
-    
-    if "file_checksum" in submission_json:
-        file_element.set("checksum", submission_json["file_checksum"])
-        file_element.set("checksum_method", "MD5")
-    
-    if "file_name" in submission_json:
-        file_element.set("filename", submission_json["file_name"])
-        
-    if "file_format" in submission_json:
-        file_element.set("filetype", submission_json["file_format"])
-    
-    return run
+        raise ValueError("Experiment accession or alias must be provided")
+    
+    file_attributes = ""
+    if record.file_checksum is not None:
+        file_attributes += f' checksum={_quote_attr(record.file_checksum)} checksum_method="{CHECKSUM_METHOD}"'
+    if record.file_name is not None:
+        file_attributes += f' filename={_quote_attr(record.file_name)}'
+    if record.file_format is not None:
+        file_attributes += f' filetype={_quote_static_attr(record.file_format)}'
+    
+    newline, indent = layout
+    _write_record_head(write, layout, "RUN", alias, center_name, broker_name, accession)
+    write(f"{indent[2]}<EXPERIMENT_REF {experiment_ref}/>{newline}")
+    write(f"{indent[2]}<DATA_BLOCK>{newline}{indent[3]}<FILES>{newline}{indent[4]}<FILE{file_attributes}/>{newline}"
+          f"{indent[3]}</FILES>{newline}{indent[2]}</DATA_BLOCK>{newline}")
+    write(f"{indent[1]}</RUN>{newline}")
 
 
 def generate_run_xml(submission_json: Dict[str, Any], alias: str, experiment_accession: Optional[str] = None,
                     experiment_alias: Optional[str] = None, center_name: str = "AToL",
-                    broker_name: str = "AToL", accession: Optional[str] = None) -> str:
+                    broker_name: str = "AToL", accession: Optional[str] = None, pretty: bool = False) -> str:
     """
     Generate ENA run XML from submission JSON data.
     
@@ -321,31 +744,83 @@ def generate_run_xml(submission_json: Dict[str, Any], alias: str, experiment_acc
         center_name: Center name for the submission
         broker_name: Broker name for the submission
         accession: Optional accession number if the run is already registered
+        pretty: Indent the output for reading; ENA only needs well-formed XML
         
     Returns:
-        Pretty-printed XML string in ENA run format
+        XML string in ENA run format
+
+    Raises:
+        ValueError: If no experiment reference is available
     """
-    run_set = ET.Element("RUN_SET")
-    
-    run = _create_run_element(
-        submission_json=submission_json,
-        alias=alias,
-        experiment_accession=experiment_accession,
-        experiment_alias=experiment_alias,
-        center_name=center_name,
-        broker_name=broker_name,
-        accession=accession
-    )
+    layout = _layout(pretty)
+    buffer = StringIO()
+    buffer.write(XML_DECLARATION + "<RUN_SET>" + layout.newline)
+    _write_run(buffer.write, layout, submission_json, alias, experiment_accession, experiment_alias,
+               center_name, broker_name, accession)
+    buffer.write("</RUN_SET>" + layout.newline)
+    return buffer.getvalue()
+
+
+def _write_runs(write: Callable[[str], Any], layout: _Layout, runs_data: Iterable[Dict[str, Any]],
+                experiment_accession: Optional[str] = None, experiment_alias: Optional[str] = None) -> None:
+    """
+    Write the RUN elements for a sequence of runs.
+    """
+    for run_data in runs_data:
+        _write_run(
+            write,
+            layout,
+            submission_json=run_data["submission_json"],
+            alias=run_data["alias"],
+            experiment_accession=experiment_accession,
+            experiment_alias=experiment_alias,
+            center_name=run_data.get("center_name", "AToL"),
+            broker_name=run_data.get("broker_name", "AToL"),
+            accession=run_data.get("accession")
+        )
+
+
+def _write_runs_shard(runs_data: List[Dict[str, Any]], layout: _Layout, experiment_accession: Optional[str] = None,
+                      experiment_alias: Optional[str] = None) -> str:
+    """
+    Write the RUN elements for a list of runs and return the text.
+    """
+    buffer = StringIO()
+    _write_runs(buffer.write, layout, runs_data, experiment_accession, experiment_alias)
+    return buffer.getvalue()
+
+
+def generate_runs_xml_to(out: TextIO, runs_data: Iterable[Dict[str, Any]],
+                         experiment_accession: Optional[str] = None, experiment_alias: Optional[str] = None,
+                         pretty: bool = False) -> None:
+    """
+    Write ENA run XML for multiple runs to a text stream.
     
-    run_set.append(run)
+    Each RUN element is written as soon as it is built, so runs_data can be a
+    generator and the document is never held in memory as a whole.
     
-    rough_string = ET.tostring(run_set, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ", encoding="UTF-8").decode('UTF-8')
+    Args:
+        out: Writable text stream, e.g. a file opened in text mode
+        runs_data: Iterable of run dictionaries, as for generate_runs_xml
+        experiment_accession: Optional experiment accession to override all runs
+        experiment_alias: Optional experiment alias/refname to override all runs
+        pretty: Indent the output for reading; ENA only needs well-formed XML
+    """
+    layout = _layout(pretty)
+    runs = iter(runs_data)
+    first = next(runs, None)
+    if first is None:
+        out.write(XML_DECLARATION + "<RUN_SET/>" + layout.newline)
+        return
+    
+    out.write(XML_DECLARATION + "<RUN_SET>" + layout.newline)
+    _write_runs(out.write, layout, chain((first,), runs), experiment_accession, experiment_alias)
+    out.write("</RUN_SET>" + layout.newline)
 
 
 def generate_runs_xml(runs_data: List[Dict[str, Any]], experiment_accession: Optional[str] = None,
-                   experiment_alias: Optional[str] = None) -> str:
+                   experiment_alias: Optional[str] = None, max_workers: Optional[int] = None,
+                   pretty: bool = False) -> str:
     """
     Generate ENA run XML for multiple runs.
     
@@ -356,31 +831,24 @@ def generate_runs_xml(runs_data: List[Dict[str, Any]], experiment_accession: Opt
             - accession: Optional accession number
         experiment_accession: Optional experiment accession to override all runs
         experiment_alias: Optional experiment alias/refname to override all runs
+        max_workers: Optional number of worker processes; when greater than one, large
+            batches are split across up to this many workers of the shared pool. Only
+            for offline batch jobs; request handlers must leave it unset
+        pretty: Indent the output for reading; ENA only needs well-formed XML
             
     Returns:
-        Pretty-printed XML string in ENA run format
+        XML string in ENA run format
+
+    Raises:
+        ValueError: If a run has no experiment reference
     """
-    run_set = ET.Element("RUN_SET")
-    
-    for run_data in runs_data:
-        submission_json = run_data["submission_json"]
-        alias = run_data["alias"]
-        accession = run_data.get("accession")
-        center_name = run_data.get("center_name", "AToL")
-        broker_name = run_data.get("broker_name", "AToL")
-        
-        run = _create_run_element(
-            submission_json=submission_json,
-            alias=alias,
-            experiment_accession=experiment_accession,
-            experiment_alias=experiment_alias,
-            center_name=center_name,
-            broker_name=broker_name,
-            accession=accession
-        )
-        
-        run_set.append(run)
-    
-    rough_string = ET.tostring(run_set, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ", encoding="UTF-8").decode('UTF-8')
+    if max_workers and max_workers > 1 and len(runs_data) >= PARALLEL_MIN_RECORDS:
+        layout = _layout(pretty)
+        write_shard = partial(_write_runs_shard, layout=layout, experiment_accession=experiment_accession,
+                              experiment_alias=experiment_alias)
+        body = _map_shards(write_shard, runs_data, max_workers)
+        return XML_DECLARATION + "<RUN_SET>" + layout.newline + body + "</RUN_SET>" + layout.newline
+    
+    buffer = StringIO()
+    generate_runs_xml_to(buffer, runs_data, experiment_accession, experiment_alias, pretty)
+    return buffer.getvalue()
@@ -273,6 +273,7 @@ CREATE TABLE genome_note (
     genome_note_id_serial TEXT NOT NULL UNIQUE,
     organism_id UUID REFERENCES organism(id) NOT NULL,
     note TEXT,
+    note_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', coalesce(note, ''))) STORED,
     other_fields TEXT,
     -- TODO UID or TEXT with semantic versioning?
     version_id UUID,
@@ -321,3 +322,30 @@ CREATE INDEX idx_experiment_sample_id ON experiment(sample_id);
 CREATE INDEX idx_assembly_sample_id ON assembly(sample_id);
 CREATE INDEX idx_assembly_organism_id ON assembly(organism_id);
 CREATE INDEX idx_assembly_experiment_id ON assembly(experiment_id);
+CREATE INDEX idx_genome_note_organism_id ON genome_note(organism_id);
+
+-- Published genome notes, newest first: partial index so get_published_notes only touches published rows.
+-- note is not INCLUDEd: b-tree entries are capped at about a third of a page, so a long note would fail to insert.
+CREATE INDEX idx_genome_note_published ON genome_note(updated_at DESC) INCLUDE (id, organism_id) WHERE is_published = TRUE;
+
+-- Full-text search over genome note content
+CREATE INDEX idx_genome_note_note_tsv ON genome_note USING GIN (note_tsv);
+
+-- Append-only submission/fetched history: index by parent then age and mark it as the cluster
+-- index so each parent's rows can be stored together. This only records the index; a bare
+-- CLUSTER, run periodically during maintenance, rewrites the tables in its order.
+CREATE INDEX idx_sample_submission_sample_id_created_at ON sample_submission(sample_id, created_at);
+CREATE INDEX idx_sample_fetched_sample_id_created_at ON sample_fetched(sample_id, created_at);
+CREATE INDEX idx_experiment_submission_experiment_id_created_at ON experiment_submission(experiment_id, created_at);
+CREATE INDEX idx_experiment_fetched_experiment_id_created_at ON experiment_fetched(experiment_id, created_at);
+CREATE INDEX idx_assembly_submission_assembly_id_created_at ON assembly_submission(assembly_id, created_at);
+CREATE INDEX idx_assembly_fetched_assembly_id_created_at ON assembly_fetched(assembly_id, created_at);
+ALTER TABLE sample_submission CLUSTER ON idx_sample_submission_sample_id_created_at;
+ALTER TABLE sample_fetched CLUSTER ON idx_sample_fetched_sample_id_created_at;
+ALTER TABLE experiment_submission CLUSTER ON idx_experiment_submission_experiment_id_created_at;
+ALTER TABLE experiment_fetched CLUSTER ON idx_experiment_fetched_experiment_id_created_at;
+ALTER TABLE assembly_submission CLUSTER ON idx_assembly_submission_assembly_id_created_at;
+ALTER TABLE assembly_fetched CLUSTER ON idx_assembly_fetched_assembly_id_created_at;
+
+-- Read listing filtered by experiment and file format
+CREATE INDEX idx_read_experiment_id_file_format ON read(experiment_id, file_format);
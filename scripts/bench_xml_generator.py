@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark the ENA XML generators on synthetic payloads.
+
+Times the single-record and bulk generators for samples, experiments and runs at
+several batch sizes, so changes to app/utils/xml_generator.py can be compared
+before and after. Memoization caches are cleared before every timed call, so the
+numbers reflect a cold build.
+
+Usage:
+    python scripts/bench_xml_generator.py
+    python scripts/bench_xml_generator.py --sizes 1 100 10000 --repeat 3
+    python scripts/bench_xml_generator.py --profile runs --sizes 10000
+"""
+
+import argparse
+import cProfile
+import pstats
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils import xml_generator  # noqa: E402
+
+ORGANISM = SimpleNamespace(tax_id=9606, scientific_name="Homo sapiens", common_name="human")
+
+
+def make_samples(count):
+    return [
+        {
+            "organism": ORGANISM,
+            "alias": f"sample_{i}",
+            "submission_json": {
+                "title": f"Sample {i}",
+                "description": "Tissue sample & extract",
+                "collection date": "2023-05-01",
+                "geographic location (country and/or sea)": "Australia",
+                "geographic location (latitude)": -35.28,
+                "geographic location (longitude)": 149.13,
+                "specimen_id": f"SPEC-{i}",
+                "lifestage": "adult",
+                "sex": "not collected",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def make_experiments(count):
+    return [
+        {
+            "alias": f"experiment_{i}",
+            "sample_alias": f"sample_{i}",
+            "submission_json": {
+                "title": f"Experiment {i}",
+                "design_description": "Whole genome sequencing",
+                "library_name": f"LIB{i}",
+                "library_strategy": "WGS",
+                "library_source": "GENOMIC",
+                "library_selection": "RANDOM",
+                "library_layout": "PAIRED",
+                "nominal_length": 350,
+                "platform": "ILLUMINA",
+                "instrument_model": "Illumina NovaSeq 6000",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def make_runs(count):
+    return [
+        {
+            "alias": f"run_{i}",
+            "submission_json": {
+                "experiment_alias": f"experiment_{i}",
+                "file_name": f"run_{i}_R1.fastq.gz",
+                "file_checksum": f"{i:032x}",
+                "file_format": "FASTQ",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def clear_caches():
+    for name in dir(xml_generator):
+        cache_clear = getattr(getattr(xml_generator, name), "cache_clear", None)
+        if cache_clear is not None:
+            cache_clear()
+
+
+def single_samples(data):
+    for item in data:
+        xml_generator.generate_sample_xml(item["organism"], item["submission_json"], item["alias"])
+
+
+def single_experiments(data):
+    for item in data:
+        xml_generator.generate_experiment_xml(item["submission_json"], item["alias"], study_alias="study",
+                                              sample_alias=item["sample_alias"])
+
+
+def single_runs(data):
+    for item in data:
+        xml_generator.generate_run_xml(item["submission_json"], item["alias"])
+
+
+CASES = {
+    "samples": (make_samples, single_samples, xml_generator.generate_samples_xml),
+    "experiments": (make_experiments, single_experiments,
+                    lambda data: xml_generator.generate_experiments_xml(data, study_alias="study")),
+    "runs": (make_runs, single_runs, xml_generator.generate_runs_xml),
+}
+
+
+def best_of(func, data, repeat):
+    """Return the fastest of repeat cold runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmarks(sizes, repeat):
+    print(f"{'case':<12}{'records':>10}{'single (ms)':>14}{'bulk (ms)':>12}{'bulk us/rec':>13}")
+    for name, (make, single, bulk) in CASES.items():
+        for size in sizes:
+            data = make(size)
+            single_time = best_of(single, data, repeat)
+            bulk_time = best_of(bulk, data, repeat)
+            print(f"{name:<12}{size:>10}{single_time * 1000:>14.2f}{bulk_time * 1000:>12.2f}"
+                  f"{bulk_time * 1e6 / size:>13.2f}")
+
+
+def run_profile(name, size):
+    make, _, bulk = CASES[name]
+    data = make(size)
+    clear_caches()
+    profiler = cProfile.Profile()
+    profiler.runcall(bulk, data)
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--profile", choices=sorted(CASES), help="Profile the bulk generator for one case")
+    args = parser.parse_args()
+
+    if args.profile:
+        run_profile(args.profile, max(args.sizes))
+    else:
+        run_benchmarks(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
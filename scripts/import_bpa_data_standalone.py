@@ -12,7 +12,6 @@ Usage:
 """
 
 import json
-import uuid
 import os
 from pathlib import Path
 import psycopg2
@@ -22,6 +21,9 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv(Path(__file__).parent.parent / ".env")
 
+# Rows sent per multi-row INSERT statement
+PAGE_SIZE = 1000
+
 # Get database parameters from environment variables
 def get_db_params():
     return {
@@ -42,20 +44,21 @@ def load_json_file(file_path):
         return None
 
 
-def import_organisms(conn, organisms_data):
+def import_organisms(conn, cursor, organisms_data):
     """
     Import organism data into the database.
     
     Args:
         conn: Database connection
+        cursor: Cursor on conn shared by all importers
         organisms_data: Dictionary of organism data keyed by tax_id
     """
     print(f"Importing {len(organisms_data)} organisms...")
     
     created_count = 0
     skipped_count = 0
-    
-    cursor = conn.cursor()
+    existing_count = 0
+    rows = []
     
     for organism_grouping_key, organism_data in organisms_data.items():
         # Extract tax_id from the organism data
@@ -66,14 +69,6 @@ def import_organisms(conn, organisms_data):
             skipped_count += 1
             continue
         
-        # Check if organism already exists by grouping key
-        cursor.execute("SELECT id FROM organism WHERE organism_grouping_key = %s", (organism_grouping_key,))
-        existing = cursor.fetchone()
-        if existing:
-            print(f"Organism with grouping key {organism_grouping_key} already exists, skipping.")
-            skipped_count += 1
-            continue
-        
         # Create new organism
         scientific_name = organism_data.get("scientific_name")
         if not scientific_name:
@@ -81,43 +76,71 @@ def import_organisms(conn, organisms_data):
             skipped_count += 1
             continue
         
-        try:
-            # Generate UUID for organism
-            organism_id = str(uuid.uuid4())
-            cursor.execute(
-                """
-                INSERT INTO organism (id, organism_grouping_key, tax_id, scientific_name, bpa_json)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-                """,
-                (
-                    organism_id,
-                    organism_grouping_key,
-                    tax_id,
-                    scientific_name,
-                    json.dumps(organism_data)
+        rows.append((
+            organism_grouping_key,
+            tax_id,
+            scientific_name,
+            psycopg2.extras.Json(organism_data)
+        ))
+    
+    # Insert all organisms in multi-row statements and a single transaction; the unique
+    # grouping key makes existing organisms no-ops, so they need no separate lookup
+    failed_count = 0
+    try:
+        cursor.execute("SAVEPOINT organism_batch")
+        created = psycopg2.extras.execute_values(
+            cursor,
+            """
+            INSERT INTO organism (organism_grouping_key, tax_id, scientific_name, bpa_json)
+            VALUES %s
+            ON CONFLICT (organism_grouping_key) DO NOTHING
+            RETURNING id
+            """,
+            rows,
+            page_size=PAGE_SIZE,
+            fetch=True
+        )
+        cursor.execute("RELEASE SAVEPOINT organism_batch")
+        created_count = len(created)
+    except Exception as e:
+        # One bad row fails the whole batch, so retry row by row and skip only the bad rows
+        cursor.execute("ROLLBACK TO SAVEPOINT organism_batch")
+        print(f"Batch insert failed ({e}), inserting organisms one at a time...")
+        for organism_grouping_key, tax_id, scientific_name, bpa_json in rows:
+            try:
+                cursor.execute("SAVEPOINT organism_row")
+                cursor.execute(
+                    """
+                    INSERT INTO organism (organism_grouping_key, tax_id, scientific_name, bpa_json)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (organism_grouping_key) DO NOTHING
+                    """,
+                    (organism_grouping_key, tax_id, scientific_name, bpa_json)
                 )
-            )
-            
-            conn.commit()
-            created_count += 1
-            if created_count % 100 == 0:
-                print(f"Created {created_count} organisms...")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error creating organism with tax_id {tax_id}: {e}")
-            skipped_count += 1
+                created_count += cursor.rowcount
+                cursor.execute("RELEASE SAVEPOINT organism_row")
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT organism_row")
+                print(f"Error creating organism with tax_id {tax_id}: {e}")
+                failed_count += 1
     
-    print(f"Organism import complete. Created: {created_count}, Skipped: {skipped_count}")
+    # Commit all organisms in one transaction
+    conn.commit()
+    existing_count = len(rows) - created_count - failed_count
+    skipped_count += existing_count + failed_count
+    
+    print(f"Organism import complete. Created: {created_count}, Skipped: {skipped_count} "
+          f"({existing_count} already existed)")
     return created_count
 
 
-def import_samples(conn, samples_data):
+def import_samples(conn, cursor, samples_data):
     """
     Import sample data into the database.
     
     Args:
         conn: Database connection
+        cursor: Cursor on conn shared by all importers
         samples_data: Dictionary of sample data keyed by bpa_sample_id
     """
     print(f"Importing {len(samples_data)} samples...")
@@ -125,63 +148,62 @@ def import_samples(conn, samples_data):
     created_samples_count = 0
     created_submission_count = 0
     skipped_count = 0
+    existing_count = 0
+    
+    # Resolve every referenced organism in one query rather than one per sample
+    cursor.execute(
+        "SELECT organism_grouping_key, id FROM organism WHERE organism_grouping_key = ANY(%s)",
+        (list({data["organism_grouping_key"] for data in samples_data.values() if "organism_grouping_key" in data}),)
+    )
+    organism_ids = dict(cursor.fetchall())
     
-    cursor = conn.cursor()
+    # Parse and plan the per-row insert once. The sample_submission record reuses the
+    # sample's generated id and stored JSON, and an existing bpa_sample_id inserts neither
+    cursor.execute(
+        """
+        PREPARE insert_sample (uuid, text, jsonb) AS
+        WITH new_sample AS (
+            INSERT INTO sample (organism_id, bpa_sample_id, source_json)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (bpa_sample_id) DO NOTHING
+            RETURNING id, organism_id, source_json
+        )
+        INSERT INTO sample_submission (sample_id, organism_id, internal_json)
+        SELECT id, organism_id, source_json FROM new_sample
+        """
+    )
     
     for bpa_sample_id, sample_data in samples_data.items():
-        # Check if sample already exists
-        cursor.execute("SELECT id FROM sample WHERE bpa_sample_id = %s", (bpa_sample_id,))
-        existing = cursor.fetchone()
-        if existing:
-            print(f"Sample with name {bpa_sample_id} already exists, skipping.")
-            skipped_count += 1
-            continue
-        
         # Get organism reference from sample data
         organism_id = None
         if "organism_grouping_key" in sample_data:
             organism_grouping_key = sample_data["organism_grouping_key"]
             # Look up the organism ID by grouping key
-            cursor.execute("SELECT id FROM organism WHERE organism_grouping_key = %s", (organism_grouping_key,))
-            organism_result = cursor.fetchone()
-            if organism_result:
-                organism_id = organism_result[0]
-            else:
+            organism_id = organism_ids.get(organism_grouping_key)
+            if not organism_id:
                 print(f"Warning: Organism with grouping key {organism_grouping_key} not found for sample {bpa_sample_id}. Creating sample without organism reference.")
         
         try:
-            # Create new sample
-            sample_id = str(uuid.uuid4())
+            # A savepoint lets one bad row be skipped without losing the rest of the transaction
+            cursor.execute("SAVEPOINT sample_row")
+            
+            # Create the sample and its sample_submission record
             cursor.execute(
-                """
-                INSERT INTO sample (id, organism_id, bpa_sample_id, source_json)
-                VALUES (%s, %s, %s, %s)
-                RETURNING id
-                """,
+                "EXECUTE insert_sample (%s, %s, %s)",
                 (
-                    sample_id,
                     organism_id,
                     bpa_sample_id,
-                    json.dumps(sample_data)
-                )
-            )
-
-
-            # Create sample_submission record
-            cursor.execute(
-                """
-                INSERT INTO sample_submission (id, sample_id, organism_id, internal_json)
-                VALUES (%s, %s, %s, %s)
-                """,
-                (
-                    str(uuid.uuid4()),
-                    sample_id,
-                    organism_id,
-                    json.dumps(sample_data)
+                    psycopg2.extras.Json(sample_data)
                 )
             )
+            inserted = cursor.rowcount
             
-            conn.commit()
+            cursor.execute("RELEASE SAVEPOINT sample_row")
+            if not inserted:
+                # Re-runs hit this for every row, so count it rather than printing each one
+                existing_count += 1
+                skipped_count += 1
+                continue
             created_samples_count += 1
             created_submission_count += 1
             
@@ -189,21 +211,28 @@ def import_samples(conn, samples_data):
                 print(f"Created {created_samples_count} samples...")
                 
         except Exception as e:
-            conn.rollback()
+            cursor.execute("ROLLBACK TO SAVEPOINT sample_row")
             print(f"Error creating sample {bpa_sample_id}: {e}")
             skipped_count += 1
     
+    cursor.execute("DEALLOCATE insert_sample")
+    
+    # Commit all samples in one transaction
+    conn.commit()
+    
     print(f"Sample import complete. Created samples: {created_samples_count}, "
-          f"Created submission records: {created_submission_count}, Skipped: {skipped_count}")
+          f"Created submission records: {created_submission_count}, Skipped: {skipped_count} "
+          f"({existing_count} already existed)")
     return created_samples_count
 
 
-def import_experiments(conn, experiments_data):
+def import_experiments(conn, cursor, experiments_data):
     """
     Import experiment data into the database.
     
     Args:
         conn: Database connection
+        cursor: Cursor on conn shared by all importers
         experiments_data: Dictionary of experiment data keyed by package_id
     """
     print(f"Importing experiments from {len(experiments_data)} experiment packages...")
@@ -211,8 +240,33 @@ def import_experiments(conn, experiments_data):
     created_experiments_count = 0
     created_submission_count = 0
     skipped_count = 0
+    existing_count = 0
+    
+    # Resolve every referenced sample in one query rather than one per experiment
+    cursor.execute(
+        "SELECT bpa_sample_id, id FROM sample WHERE bpa_sample_id = ANY(%s)",
+        (list({data['bpa_sample_id'] for data in experiments_data.values() if 'bpa_sample_id' in data}),)
+    )
+    sample_ids = dict(cursor.fetchall())
     
-    cursor = conn.cursor()
+    # Parse and plan the per-row insert once; an existing bpa_package_id inserts neither row
+    cursor.execute(
+        """
+        PREPARE insert_experiment (uuid, text, jsonb) AS
+        WITH new_experiment AS (
+            INSERT INTO experiment (
+                sample_id, bpa_package_id
+            )
+            VALUES ($1, $2)
+            ON CONFLICT (bpa_package_id) DO NOTHING
+            RETURNING id, sample_id
+        )
+        INSERT INTO experiment_submission (
+            experiment_id, sample_id, internal_json
+        )
+        SELECT id, sample_id, $3 FROM new_experiment
+        """
+    )
     
     for package_id, experiment_data in experiments_data.items():
         # Check if experiment data contains bpa_sample_id
@@ -224,48 +278,32 @@ def import_experiments(conn, experiments_data):
         bpa_sample_id = experiment_data['bpa_sample_id']
 
         # Get sample id from sample name
-        cursor.execute("SELECT id FROM sample WHERE bpa_sample_id = %s", (bpa_sample_id,))
-        sample_id = cursor.fetchone()
+        sample_id = sample_ids.get(bpa_sample_id)
         if not sample_id:
             print(f"Sample with name {bpa_sample_id} not found, skipping.")
             skipped_count += 1
             continue
 
         try:
-            # Create new experiment
-            experiment_id = str(uuid.uuid4())
-            cursor.execute(
-                """
-                INSERT INTO experiment (
-                    id, sample_id, bpa_package_id
-                )
-                VALUES (%s, %s, %s)
-                RETURNING id
-                """,
-                (
-                    experiment_id,
-                    sample_id,
-                    package_id,
-                )
-            )
+            # A savepoint lets one bad row be skipped without losing the rest of the transaction
+            cursor.execute("SAVEPOINT experiment_row")
             
-            # Create experiment_submission record
+            # Create the experiment and its experiment_submission record
             cursor.execute(
-                """
-                INSERT INTO experiment_submission (
-                    id, experiment_id, sample_id, internal_json
-                )
-                VALUES (%s, %s, %s, %s)
-                """,
+                "EXECUTE insert_experiment (%s, %s, %s)",
                 (
-                    str(uuid.uuid4()),
-                    experiment_id,
                     sample_id,
-                    json.dumps(experiment_data)
+                    package_id,
+                    psycopg2.extras.Json(experiment_data)
                 )
             )
+            inserted = cursor.rowcount
             
-            conn.commit()
+            cursor.execute("RELEASE SAVEPOINT experiment_row")
+            if not inserted:
+                existing_count += 1
+                skipped_count += 1
+                continue
             created_experiments_count += 1
             created_submission_count += 1
             
@@ -273,12 +311,18 @@ def import_experiments(conn, experiments_data):
                 print(f"Created {created_experiments_count} experiments...")
                 
         except Exception as e:
-            conn.rollback()
+            cursor.execute("ROLLBACK TO SAVEPOINT experiment_row")
             print(f"Error creating experiment {package_id}: {e}")
             skipped_count += 1
     
+    cursor.execute("DEALLOCATE insert_experiment")
+    
+    # Commit all experiments in one transaction
+    conn.commit()
+    
     print(f"Experiment import complete. Created experiments: {created_experiments_count}, "
-          f"Created submission records: {created_submission_count}, Skipped: {skipped_count}")
+          f"Created submission records: {created_submission_count}, Skipped: {skipped_count} "
+          f"({existing_count} already existed)")
     
     return created_experiments_count
 
@@ -323,17 +367,19 @@ def main():
         # Import data
         print("\n=== Starting BPA Data Import ===\n")
         
-        # 1. Import organisms
-        print("\n--- Importing Organisms ---\n")
-        organisms_count = import_organisms(conn, organisms_data)
-        
-        # 2. Import samples
-        print("\n--- Importing Samples ---\n")
-        samples_count = import_samples(conn, samples_data)
-        
-        # 3. Import experiments
-        print("\n--- Importing Experiments ---\n")
-        experiments_count = import_experiments(conn, experiments_data)
+        # One cursor serves every phase and is closed once the import finishes
+        with conn.cursor() as cursor:
+            # 1. Import organisms
+            print("\n--- Importing Organisms ---\n")
+            organisms_count = import_organisms(conn, cursor, organisms_data)
+            
+            # 2. Import samples
+            print("\n--- Importing Samples ---\n")
+            samples_count = import_samples(conn, cursor, samples_data)
+            
+            # 3. Import experiments
+            print("\n--- Importing Experiments ---\n")
+            experiments_count = import_experiments(conn, cursor, experiments_data)
         
         print("\n=== BPA Data Import Complete ===\n")
         print(f"Summary:")
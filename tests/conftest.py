@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+# app.db.session builds its engine from these at import time; no connection is made
+for name, value in {
+    "POSTGRES_USER": "atol",
+    "POSTGRES_PASSWORD": "atol",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "atol",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.dialects.postgresql import JSONB  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.db.session import Base  # noqa: E402
+from app.models import assembly, bioproject, bpa_initiative, experiment, organism, read, sample  # noqa: E402,F401
+from app.services.base_service import lookup_cache  # noqa: E402
+
+# Service tests run against in-memory SQLite, which has no JSONB; store it as JSON
+compiles(JSONB, "sqlite")(lambda type_, compiler, **kw: "JSON")
+
+# Tables the service tests create; genome_note (tsvector) and users (ARRAY) need Postgres
+SQLITE_TABLES = [
+    Base.metadata.tables[name]
+    for name in ("organism", "sample", "sample_submission", "experiment", "read", "bpa_initiative", "bioproject")
+]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=SQLITE_TABLES)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    lookup_cache.clear()
+    with Session(engine) as session:
+        yield session
+    lookup_cache.clear()
+
+
+@pytest.fixture
+def count_queries(engine):
+    """
+    Record every SQL statement the engine sends; tests assert a query budget on its length.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,57 @@
+"""
+Query budgets for the assembly pipeline-inputs routes, called directly with a SQLite session.
+"""
+import pytest
+
+from app.api.v1.endpoints import assemblies
+from app.models.experiment import Experiment
+from app.models.organism import Organism
+from app.models.read import Read
+from app.models.sample import Sample
+
+
+def add_organism(db, key, tax_id=9606, samples=2, experiments=2, reads=2):
+    organism = Organism(organism_grouping_key=key, tax_id=tax_id, scientific_name="Homo sapiens")
+    db.add(organism)
+    for s in range(samples):
+        sample = Sample(bpa_sample_id=f"{key}-s{s}", organism=organism)
+        for e in range(experiments):
+            experiment = Experiment(bpa_package_id=f"{key}-s{s}-p{e}", sample=sample)
+            for r in range(reads):
+                name = f"{key}-s{s}-p{e}-r{r}.fastq.gz"
+                db.add(Read(experiment=experiment, bpa_dataset_id="d", bpa_resource_id=name, file_name=name,
+                            bioplatforms_url=f"https://example.org/{name}"))
+    db.commit()
+    # Start the route from an empty identity map, as a new request would
+    db.expunge_all()
+
+
+@pytest.mark.parametrize("samples,experiments,reads", [(1, 1, 1), (3, 3, 3)])
+def test_pipeline_inputs_query_budget(db, count_queries, samples, experiments, reads):
+    add_organism(db, "k1", samples=samples, experiments=experiments, reads=reads)
+    count_queries.clear()
+    result = assemblies.get_pipeline_inputs(db=db, organism_grouping_key="k1", current_user=None)
+    assert len(result[0]["files"]) == samples * experiments * reads
+    # organism, samples, experiments, reads
+    assert len(count_queries) == 4
+
+
+def test_pipeline_inputs_query_budget_without_samples(db, count_queries):
+    add_organism(db, "k1", samples=0)
+    count_queries.clear()
+    assert assemblies.get_pipeline_inputs(db=db, organism_grouping_key="k1", current_user=None)[0]["files"] == {}
+    assert len(count_queries) == 2
+
+
+@pytest.mark.parametrize("samples,experiments,reads", [(1, 1, 1), (3, 3, 3)])
+def test_pipeline_inputs_by_tax_id_query_budget(db, count_queries, samples, experiments, reads):
+    for key in ("k1", "k2"):
+        add_organism(db, key, samples=samples, experiments=experiments, reads=reads)
+    count_queries.clear()
+    result = assemblies.get_pipeline_inputs_by_tax_id(db=db, tax_id="9606", current_user=None)
+    assert {key: len(value["files"]) for key, value in result["9606"].items()} == {
+        "k1": samples * experiments * reads,
+        "k2": samples * experiments * reads,
+    }
+    # organisms, then samples, experiments and reads for each organism
+    assert len(count_queries) == 1 + 3 * 2
@@ -0,0 +1,159 @@
+"""
+Tests for app.services.base_service against an in-memory SQLite database.
+"""
+from sqlalchemy import text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+import pytest
+
+from app.models.organism import Organism
+from app.models.sample import Sample
+from app.services import base_service
+from app.services.base_service import LookupCache, lookup_cache
+from app.services.organism_service import organism_service
+from app.services.sample_service import sample_service
+
+
+def add_organism(db, key="k1", tax_id=9606, scientific_name="Homo sapiens"):
+    organism = Organism(organism_grouping_key=key, tax_id=tax_id, scientific_name=scientific_name)
+    db.add(organism)
+    db.commit()
+    return organism
+
+
+def test_lookup_cache_hit_and_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(base_service.time, "monotonic", lambda: now[0])
+    cache = LookupCache(ttl=60.0)
+    cache.set(("model", "field", "value"), "pk")
+    assert cache.get(("model", "field", "value")) == "pk"
+    now[0] += 59.0
+    assert cache.get(("model", "field", "value")) == "pk"
+    now[0] += 2.0
+    assert cache.get(("model", "field", "value")) is None
+
+
+def test_lookup_cache_evicts_least_recently_used():
+    cache = LookupCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_get_by_cached_hit(db):
+    organism = add_organism(db)
+    assert organism_service.get_by_organism_grouping_key(db, "k1") is organism
+    assert lookup_cache.get((Organism, "organism_grouping_key", "k1")) == organism.id
+    assert organism_service.get_by_organism_grouping_key(db, "k1") is organism
+
+
+def test_flush_invalidates_cached_lookups(db):
+    organism = add_organism(db)
+    organism_service.get_by_organism_grouping_key(db, "k1")
+    organism.organism_grouping_key = "k2"
+    db.flush()
+    assert lookup_cache.get((Organism, "organism_grouping_key", "k1")) is None
+    assert organism_service.get_by_organism_grouping_key(db, "k1") is None
+    assert organism_service.get_by_organism_grouping_key(db, "k2") is organism
+
+
+def test_flush_only_invalidates_written_models(db):
+    organism = add_organism(db)
+    db.add(Sample(bpa_sample_id="s1", sample_accession="SAMEA1", organism_id=organism.id))
+    db.commit()
+    organism_service.get_by_organism_grouping_key(db, "k1")
+    sample_service.get_by_sample_accession(db, "SAMEA1")
+    db.add(Sample(bpa_sample_id="s2"))
+    db.flush()
+    assert lookup_cache.get((Organism, "organism_grouping_key", "k1")) == organism.id
+    assert lookup_cache.get((Sample, "sample_accession", "SAMEA1")) is None
+
+
+def test_get_by_cached_rechecks_rows_changed_outside_the_session(engine, db):
+    organism = add_organism(db)
+    organism_service.get_by_organism_grouping_key(db, "k1")
+    # A write from another process never reaches this process's after_flush listener
+    db.execute(text("UPDATE organism SET organism_grouping_key = 'k2'"))
+    db.commit()
+    with Session(engine) as other:
+        assert organism_service.get_by_organism_grouping_key(other, "k1") is None
+        assert lookup_cache.get((Organism, "organism_grouping_key", "k1")) is None
+        assert organism_service.get_by_organism_grouping_key(other, "k2").id == organism.id
+
+
+def test_get_by_cached_misses_rows_deleted_outside_the_session(engine, db):
+    add_organism(db)
+    organism_service.get_by_organism_grouping_key(db, "k1")
+    db.execute(text("DELETE FROM organism"))
+    db.commit()
+    with Session(engine) as other:
+        assert organism_service.get_by_organism_grouping_key(other, "k1") is None
+    assert lookup_cache.get((Organism, "organism_grouping_key", "k1")) is None
+
+
+@pytest.mark.parametrize("field", ["tax_id", "scientific_name"])
+def test_get_by_cached_rejects_non_unique_fields(db, field):
+    with pytest.raises(ValueError, match="not unique"):
+        organism_service.get_by_cached(db, field, "x")
+
+
+def test_service_queries_raise_on_lazy_relationship_loads(db):
+    organism = add_organism(db)
+    db.add(Sample(bpa_sample_id="s1", organism_id=organism.id))
+    db.commit()
+    db.expunge_all()
+    sample = sample_service.get_by_bpa_sample_id(db, "s1")
+    with pytest.raises(InvalidRequestError):
+        sample.organism
+
+
+def test_service_queries_load_eager_relationships(db, count_queries):
+    organism = add_organism(db)
+    db.add(Sample(bpa_sample_id="s1", organism_id=organism.id))
+    db.commit()
+    db.expunge_all()
+    count_queries.clear()
+    sample = sample_service.get_by_bpa_sample_id(db, "s1", eager=["organism"])
+    assert sample.organism.organism_grouping_key == "k1"
+    assert len(count_queries) == 2
+
+
+def test_get_multi_with_filters_binds_equality_filters(db):
+    add_organism(db, "k1", tax_id=9606)
+    add_organism(db, "k2", tax_id=7460, scientific_name="Apis mellifera")
+    # The same pre-built clause is bound to each call's value
+    assert [o.organism_grouping_key for o in organism_service.get_multi_with_filters(db, tax_id=7460)] == ["k2"]
+    assert [o.organism_grouping_key for o in organism_service.get_multi_with_filters(db, tax_id=9606)] == ["k1"]
+    assert organism_service.get_multi_with_filters(db, tax_id=1) == []
+
+
+@pytest.mark.parametrize("value", [None, ""])
+def test_get_multi_with_filters_skips_unset_filters(db, value):
+    add_organism(db, "k1", tax_id=9606)
+    add_organism(db, "k2", tax_id=7460, scientific_name="Apis mellifera")
+    organisms = organism_service.get_multi_with_filters(db, tax_id=value, scientific_name=value)
+    assert sorted(o.organism_grouping_key for o in organisms) == ["k1", "k2"]
+
+
+def test_filtered_query_rejects_unknown_filters(db):
+    with pytest.raises(TypeError, match="Unknown Organism filters: colour"):
+        organism_service.filtered_query(db, {"colour": "red", "tax_id": 9606})
+    with pytest.raises(TypeError, match="Unknown Sample filters: tax_id"):
+        sample_service.get_multi_with_filters(db, tax_id=9606)
+
+
+def test_get_multi_with_filters_projects_fields(db):
+    add_organism(db, "k1", tax_id=9606)
+    add_organism(db, "k2", tax_id=7460, scientific_name="Apis mellifera")
+    rows = organism_service.get_multi_with_filters(db, fields=["organism_grouping_key", "tax_id"], tax_id=7460)
+    assert rows == [{"organism_grouping_key": "k2", "tax_id": 7460}]
+
+
+def test_paginate_rejects_unknown_fields(db):
+    with pytest.raises(ValueError, match="Unknown Organism fields: colour"):
+        organism_service.paginate(organism_service.query(db), fields=["tax_id", "colour"])
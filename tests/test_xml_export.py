@@ -0,0 +1,53 @@
+"""
+Tests for the XML export routes, called directly with a SQLite session.
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import experiment_reads_xml, xml_export
+from app.models.experiment import Experiment
+from app.models.organism import Organism
+from app.models.read import Read
+from app.models.sample import Sample, SampleSubmission
+
+
+@pytest.fixture
+def sample_submission(db):
+    organism = Organism(organism_grouping_key="k1", tax_id=9606, scientific_name="Homo sapiens")
+    sample = Sample(bpa_sample_id="s1", organism=organism)
+    submission = SampleSubmission(sample=sample, organism=organism, submission_json={"title": "Sample"})
+    db.add_all([organism, sample, submission, Experiment(bpa_package_id="p1", sample=sample)])
+    db.commit()
+    return submission
+
+
+def test_sample_routes_return_xml(db, sample_submission):
+    xml = xml_export.get_sample_xml(db=db, sample_id=sample_submission.sample_id, current_user=None)
+    assert xml.startswith('<?xml version="1.0" encoding="UTF-8"?>')
+    assert xml_export.get_experiment_sample_xml(db=db, bpa_package_id="p1", current_user=None) == xml
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+def test_sample_routes_reject_illegal_characters_with_400(db, sample_submission, monkeypatch, pretty):
+    monkeypatch.setattr(xml_export.settings, "XML_PRETTY", pretty)
+    sample_submission.submission_json = {"x": "a\x01b"}
+    db.commit()
+    with pytest.raises(HTTPException) as excinfo:
+        xml_export.get_sample_xml(db=db, sample_id=sample_submission.sample_id, current_user=None)
+    assert excinfo.value.status_code == 400
+    with pytest.raises(HTTPException) as excinfo:
+        xml_export.get_experiment_sample_xml(db=db, bpa_package_id="p1", current_user=None)
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.parametrize("pretty, head", [(False, "<RUN_SET><RUN "), (True, "<RUN_SET>\n  <RUN ")])
+def test_experiment_reads_routes_follow_xml_pretty(db, sample_submission, monkeypatch, pretty, head):
+    monkeypatch.setattr(xml_export.settings, "XML_PRETTY", pretty)
+    experiment = db.query(Experiment).one()
+    db.add(Read(experiment=experiment, bpa_dataset_id="d1", bpa_resource_id="r1",
+                submission_json={"experiment_alias": "p1", "file_name": "r1.fastq.gz"}))
+    db.commit()
+    xml = xml_export.get_experiment_reads_xml(db=db, experiment_id=experiment.id, experiment_accession=None,
+                                              experiment_alias=None, current_user=None)
+    assert head in xml
+    assert experiment_reads_xml.get_experiment_reads_xml(db=db, experiment_id=experiment.id, current_user=None) == xml
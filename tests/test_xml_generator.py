@@ -0,0 +1,312 @@
+"""
+Tests for app.utils.xml_generator.
+
+The text writers must produce exactly what lxml produces when it re-serializes the
+same document, compact or pretty-printed, and must reject the same input.
+"""
+import re
+from types import SimpleNamespace
+
+import pytest
+from lxml import etree as ET
+
+from app.utils import xml_generator
+
+ORGANISM = SimpleNamespace(tax_id=9606, scientific_name="Homo sapiens", common_name="human")
+
+ILLEGAL_STRINGS = ["bad\x01ctl", "nul\x00", "\x0b", "\x1f", "\ufffe", "\uffff", "lone \ud800 surrogate"]
+
+
+def lxml_xml(xml, pretty=False):
+    root = ET.fromstring(xml.encode())
+    return xml_generator.XML_DECLARATION + ET.tostring(root, encoding="unicode", pretty_print=pretty)
+
+
+def collapse_empty(xml):
+    # lxml writes an element whose text is "" as <TAG></TAG> but parses it back with no text
+    return re.sub(r"<(\w+)></\1>", r"<\1/>", xml)
+
+
+def assert_matches_lxml(generate, *args, **kwargs):
+    """
+    Check the compact and pretty output of a single-record generator against lxml
+    and return the parsed document.
+    """
+    compact = generate(*args, **kwargs)
+    assert collapse_empty(compact) == lxml_xml(compact)
+    assert collapse_empty(generate(*args, pretty=True, **kwargs)) == lxml_xml(compact, pretty=True)
+    return ET.fromstring(compact.encode())
+
+
+def records_xml(set_tag, xml_documents, pretty):
+    """
+    Join the records of single-record documents into one set document.
+    """
+    newline = "\n" if pretty else ""
+    head = f"{xml_generator.XML_DECLARATION}<{set_tag}>{newline}"
+    tail = f"</{set_tag}>{newline}"
+    return head + "".join(xml[len(head):-len(tail)] for xml in xml_documents) + tail
+
+
+SAMPLE_EDGE_CASES = [
+    {},
+    {"title": None, "description": None},
+    {"title": "", "description": "", "empty": "", "unset": None},
+    {"title": "& < > \"", "markup": "& < > \" '", "a & b": "<tag>"},
+    {"whitespace": "tab\there\nnewline\rreturn", "padded": "  spaced  "},
+    {"unicode": "é ünïcode \U0001f600"},
+    {"count": 3, "zero": 0, "ratio": 1.5, "flag": True, "off": False, "nested": [1, "two"]},
+    {"geographic location (latitude)": -35.28, "geographic location (longitude)": "149.13"},
+    {"ENA-CHECKLIST": "ERC000011", "project name": "other", "collecting institution": "ANU"},
+    {"ENA-CHECKLIST": None, "project name": "", "collecting institution": 0},
+    {"taxon_id": 1, "scientific_name": "ignored", "common_name": "ignored", "alias": "ignored"},
+    {"long": "x" * (xml_generator.CACHED_VALUE_MAX_LEN + 1)},
+]
+
+SAMPLE_ORGANISMS = [
+    ORGANISM,
+    SimpleNamespace(tax_id="7460", scientific_name="Apis & <mellifera>", common_name=None),
+    SimpleNamespace(tax_id=1, scientific_name=None, common_name=""),
+]
+
+
+@pytest.mark.parametrize("organism", SAMPLE_ORGANISMS)
+@pytest.mark.parametrize("submission_json", SAMPLE_EDGE_CASES)
+@pytest.mark.parametrize("accession", [None, "", "SAMEA1"])
+def test_sample_matches_lxml(submission_json, organism, accession):
+    assert_matches_lxml(xml_generator.generate_sample_xml, organism, submission_json, "s & 1", "AToL & co",
+                        "AToL", accession)
+
+
+def test_sample_elements():
+    submission_json = {"description": "about", "geographic location (latitude)": -35.28, "project name": "other",
+                       "empty": "", "scientific_name": "ignored"}
+    sample = assert_matches_lxml(xml_generator.generate_sample_xml, ORGANISM, submission_json, "s1",
+                                 accession="SAMEA1")[0]
+    assert sample.attrib == {"alias": "s1", "center_name": "AToL", "broker_name": "AToL", "accession": "SAMEA1"}
+    assert [child.tag for child in sample] == ["IDENTIFIERS", "TITLE", "SAMPLE_NAME", "DESCRIPTION",
+                                               "SAMPLE_ATTRIBUTES"]
+    assert sample.findtext("IDENTIFIERS/PRIMARY_ID") == "SAMEA1"
+    assert sample.findtext("TITLE") == "s1"
+    assert [(child.tag, child.text) for child in sample.find("SAMPLE_NAME")] == [
+        ("TAXON_ID", "9606"), ("SCIENTIFIC_NAME", "Homo sapiens"), ("COMMON_NAME", "human")]
+    assert [[child.text for child in attribute] for attribute in sample.find("SAMPLE_ATTRIBUTES")] == [
+        ["geographic location (latitude)", "-35.28", "DD"],
+        ["project name", "other"],
+        ["ENA-CHECKLIST", "ERC000053"],
+        ["collecting institution", "not provided"],
+    ]
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+def test_bulk_samples_match_single_records(pretty):
+    samples_data = [
+        {"organism": organism, "submission_json": submission_json, "alias": f"sample_{i}", "accession": f"SAMEA{i}"}
+        for i, (organism, submission_json) in enumerate(
+            (organism, submission_json) for organism in SAMPLE_ORGANISMS for submission_json in SAMPLE_EDGE_CASES)
+    ]
+    expected = records_xml("SAMPLE_SET", (
+        xml_generator.generate_sample_xml(data["organism"], data["submission_json"], data["alias"],
+                                          accession=data["accession"], pretty=pretty)
+        for data in samples_data), pretty)
+    assert xml_generator.generate_samples_xml(samples_data, pretty=pretty) == expected
+
+
+@pytest.mark.parametrize("value", ILLEGAL_STRINGS)
+def test_bulk_samples_reject_illegal_characters(value):
+    with pytest.raises(ValueError):
+        xml_generator.generate_samples_xml([{"organism": ORGANISM, "submission_json": {"a": value}, "alias": "s1"}])
+    with pytest.raises(ValueError):
+        xml_generator.generate_samples_xml([{"organism": ORGANISM, "submission_json": {value: "tag"}, "alias": "s1"}])
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize("value", ILLEGAL_STRINGS)
+def test_single_record_rejects_illegal_characters(value, pretty):
+    with pytest.raises(ValueError):
+        xml_generator.generate_sample_xml(ORGANISM, {"a": value}, "s1", pretty=pretty)
+    with pytest.raises(ValueError):
+        xml_generator.generate_sample_xml(ORGANISM, {}, value, pretty=pretty)
+    with pytest.raises(ValueError):
+        xml_generator.generate_experiment_xml({"title": value}, "e1", study_alias="st", sample_alias="sa",
+                                              pretty=pretty)
+    with pytest.raises(ValueError):
+        xml_generator.generate_run_xml({"file_name": value}, "r1", experiment_alias="ex", pretty=pretty)
+
+
+EXPERIMENT_EDGE_CASES = [
+    {},
+    {"title": "", "design_description": "", "library_name": "", "library_construction_protocol": ""},
+    {"title": "& < > \"", "design_description": "tab\there\nnewline\rreturn", "library_name": "lib & <1>",
+     "library_strategy": "WGS", "library_source": "GENOMIC", "library_selection": "RANDOM",
+     "library_construction_protocol": "  spaced  ", "insert_size": 350},
+    {"library_layout": "PAIRED"},
+    {"library_layout": "PAIRED", "nominal_length": 0},
+    {"library_layout": "PAIRED", "nominal_length": "350 & \"up\""},
+    {"library_layout": "SINGLE", "nominal_length": 350, "insert_size": 1.5},
+    {"platform": "ILLUMINA"},
+    {"platform": "OXFORD_NANOPORE", "instrument_model": "MinION & <GridION>"},
+    {"platform": None, "instrument_model": "ignored"},
+    {"platform": "", "library_strategy": None},
+    {"platform": "illumina", "instrument_model": "NovaSeq 6000"},
+    {"platform": " Oxford_Nanopore\n", "instrument_model": "PromethION"},
+    {"platform": "   ", "instrument_model": "ignored"},
+]
+
+
+@pytest.mark.parametrize("submission_json", EXPERIMENT_EDGE_CASES)
+@pytest.mark.parametrize("refs", [
+    {"study_accession": "PRJEB1", "sample_accession": "SAMEA1"},
+    {"study_alias": "study & <1>", "sample_alias": "sample \"1\"\tx"},
+])
+@pytest.mark.parametrize("accession", [None, "", "ERX1"])
+def test_experiment_matches_lxml(submission_json, refs, accession):
+    assert_matches_lxml(xml_generator.generate_experiment_xml, submission_json, "e & 1", center_name="AToL & co",
+                        accession=accession, **refs)
+
+
+def test_experiment_elements():
+    submission_json = {"title": "Experiment", "design_description": "design", "library_strategy": "WGS",
+                       "library_source": "GENOMIC", "library_selection": "RANDOM", "library_name": "",
+                       "library_construction_protocol": "protocol", "insert_size": 350, "library_layout": "PAIRED",
+                       "nominal_length": 500, "platform": "PACBIO_SMRT", "instrument_model": "Sequel II"}
+    experiment = assert_matches_lxml(xml_generator.generate_experiment_xml, submission_json, "e1",
+                                     study_accession="PRJEB1", sample_alias="s1")[0]
+    assert [child.tag for child in experiment] == ["IDENTIFIERS", "TITLE", "STUDY_REF", "DESIGN", "PLATFORM"]
+    assert experiment.find("STUDY_REF").attrib == {"accession": "PRJEB1"}
+    assert experiment.findtext("DESIGN/DESIGN_DESCRIPTION") == "design"
+    assert experiment.find("DESIGN/SAMPLE_DESCRIPTOR").attrib == {"refname": "s1"}
+    assert [(child.tag, child.text) for child in experiment.find("DESIGN/LIBRARY_DESCRIPTOR")][:-1] == [
+        ("LIBRARY_STRATEGY", "WGS"), ("LIBRARY_SOURCE", "GENOMIC"), ("LIBRARY_SELECTION", "RANDOM"),
+        ("LIBRARY_CONSTRUCTION_PROTOCOL", "protocol"), ("INSERT_SIZE", "350")]
+    assert experiment.find("DESIGN/LIBRARY_DESCRIPTOR/LIBRARY_LAYOUT/PAIRED").attrib == {"NOMINAL_LENGTH": "500"}
+    assert experiment.findtext("PLATFORM/PACBIO_SMRT/INSTRUMENT_MODEL") == "Sequel II"
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+def test_experiment_platform_is_normalized(pretty):
+    xml = xml_generator.generate_experiment_xml({"platform": " illumina ", "instrument_model": "NovaSeq 6000"},
+                                                "e1", study_accession="PRJEB1", sample_accession="SAMEA1",
+                                                pretty=pretty)
+    assert "<ILLUMINA>" in xml and "</ILLUMINA>" in xml
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize("platform", ["illumina x", "NOT_A_PLATFORM", 1, ["ILLUMINA"]])
+def test_experiment_rejects_unsupported_platform(platform, pretty):
+    with pytest.raises(ValueError, match="Unsupported sequencing platform"):
+        xml_generator.generate_experiment_xml({"platform": platform}, "e1", study_accession="PRJEB1",
+                                              sample_accession="SAMEA1", pretty=pretty)
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+def test_bulk_experiments_match_single_records(pretty):
+    experiments_data = [
+        {"submission_json": submission_json, "alias": f"experiment_{i}", "sample_alias": f"sample_{i}",
+         "accession": f"ERX{i}" if i % 2 else None}
+        for i, submission_json in enumerate(EXPERIMENT_EDGE_CASES)
+    ]
+    expected = records_xml("EXPERIMENT_SET", (
+        xml_generator.generate_experiment_xml(data["submission_json"], data["alias"], study_alias="study",
+                                              sample_alias=data["sample_alias"], accession=data["accession"],
+                                              pretty=pretty)
+        for data in experiments_data), pretty)
+    assert xml_generator.generate_experiments_xml(experiments_data, study_alias="study", pretty=pretty) == expected
+
+
+RUN_EDGE_CASES = [
+    {"experiment_alias": "exp"},
+    {"experiment_accession": "ERX1", "experiment_alias": "ignored"},
+    {"experiment_alias": "exp & <1>", "file_name": "run \"1\".fastq.gz", "file_checksum": "abc\tdef",
+     "file_format": "FASTQ"},
+    {"experiment_alias": "exp", "file_name": "", "file_checksum": "", "file_format": ""},
+    {"experiment_alias": "exp", "file_name": "tab\there\nnewline\rreturn", "file_format": "BAM & CRAM"},
+]
+
+
+@pytest.mark.parametrize("submission_json", RUN_EDGE_CASES)
+@pytest.mark.parametrize("accession", [None, "", "ERR1"])
+def test_run_matches_lxml(submission_json, accession):
+    assert_matches_lxml(xml_generator.generate_run_xml, submission_json, "r & 1", center_name="AToL & co",
+                        accession=accession)
+
+
+def test_run_elements():
+    submission_json = {"experiment_alias": "ignored", "file_name": "run.bam", "file_checksum": "abc",
+                       "file_format": "BAM"}
+    run = assert_matches_lxml(xml_generator.generate_run_xml, submission_json, "r1", experiment_accession="ERX1")[0]
+    assert [child.tag for child in run] == ["IDENTIFIERS", "EXPERIMENT_REF", "DATA_BLOCK"]
+    assert run.find("EXPERIMENT_REF").attrib == {"accession": "ERX1"}
+    assert run.find("DATA_BLOCK/FILES/FILE").attrib == {"checksum": "abc", "checksum_method": "MD5",
+                                                        "filename": "run.bam", "filetype": "BAM"}
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+def test_bulk_runs_match_single_records(pretty):
+    runs_data = [
+        {"submission_json": submission_json, "alias": f"run_{i}", "accession": f"ERR{i}" if i % 2 else None}
+        for i, submission_json in enumerate(RUN_EDGE_CASES)
+    ]
+    expected = records_xml("RUN_SET", (
+        xml_generator.generate_run_xml(data["submission_json"], data["alias"], accession=data["accession"],
+                                       pretty=pretty)
+        for data in runs_data), pretty)
+    assert xml_generator.generate_runs_xml(runs_data, pretty=pretty) == expected
+
+
+@pytest.mark.parametrize("pretty, expected", [(False, "<RUN_SET/>"), (True, "<RUN_SET/>\n")])
+def test_bulk_runs_empty(pretty, expected):
+    assert xml_generator.generate_runs_xml([], pretty=pretty) == xml_generator.XML_DECLARATION + expected
+
+
+@pytest.mark.parametrize("value", ILLEGAL_STRINGS)
+def test_bulk_experiments_and_runs_reject_illegal_characters(value):
+    with pytest.raises(ValueError):
+        xml_generator.generate_experiments_xml(
+            [{"submission_json": {"design_description": value}, "alias": "e1", "sample_alias": "s1"}],
+            study_alias="study")
+    with pytest.raises(ValueError):
+        xml_generator.generate_experiments_xml(
+            [{"submission_json": {}, "alias": "e1", "sample_alias": value}], study_alias="study")
+    with pytest.raises(ValueError):
+        xml_generator.generate_runs_xml([{"submission_json": {"experiment_alias": "x", "file_name": value},
+                                          "alias": "r1"}])
+    with pytest.raises(ValueError):
+        xml_generator.generate_runs_xml([{"submission_json": {"experiment_alias": "x"}, "alias": "r1"}],
+                                        experiment_alias=value)
+
+
+def test_parallel_runs_reject_illegal_characters():
+    runs_data = [{"submission_json": {"experiment_alias": "x", "file_name": f"run_{i}"}, "alias": f"r{i}"}
+                 for i in range(xml_generator.PARALLEL_MIN_RECORDS)]
+    runs_data[-1]["submission_json"]["file_name"] = "bad\x01ctl"
+    with pytest.raises(ValueError):
+        xml_generator.generate_runs_xml(runs_data, max_workers=2)
+
+
+class UnpicklableOrganism:
+    """Stands in for an ORM Organism, which should never be sent to a worker process."""
+    tax_id = 9606
+    scientific_name = "Homo sapiens"
+    common_name = "human"
+
+    def __reduce__(self):
+        raise TypeError("Organism instances must not be pickled")
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+def test_parallel_samples_match_serial_without_pickling_organisms(pretty):
+    samples_data = [{"organism": UnpicklableOrganism(), "submission_json": {"title": f"Sample {i}"},
+                     "alias": f"s{i}"} for i in range(xml_generator.PARALLEL_MIN_RECORDS)]
+    assert (xml_generator.generate_samples_xml(samples_data, max_workers=2, pretty=pretty)
+            == xml_generator.generate_samples_xml(samples_data, pretty=pretty))
+
+
+def test_bulk_generators_share_one_pool():
+    runs_data = [{"submission_json": {"experiment_alias": "x"}, "alias": f"r{i}"}
+                 for i in range(xml_generator.PARALLEL_MIN_RECORDS)]
+    xml_generator.generate_runs_xml(runs_data, max_workers=2)
+    pool = xml_generator._pool
+    xml_generator.generate_runs_xml(runs_data, max_workers=64)
+    assert pool is not None and xml_generator._pool is pool
+    assert pool._max_workers == xml_generator.PARALLEL_POOL_SIZE